@@ -3,7 +3,7 @@ from gol.utils import (
     init_gol_board_neighborhood_rule,
     numpy_to_life_106
 )
-from gol.hl.hashlife import construct
+from gol.hl.hashlife import construct_from_array
 
 def generate_base(
         size,
@@ -22,17 +22,9 @@ def generate_base(
     if file_life106 is not None:
         numpy_to_life_106(board, file_life106)
 
-    # generate tuples (cells x,y coordinate which are 'on')
-    pat_tuples = tuple(
-        (x,y)
-        for x in range(size)
-        for y in range(size)
-        if board[y,x]
-    )
-
     # construct pattern
     init_t = time.process_time()
-    node = construct(pat_tuples)
+    node = construct_from_array(board)
     t = time.process_time() - init_t
     print(f'Computation (hl-construct) took {t*1000.0:.1f} ms')
 
@@ -0,0 +1,147 @@
+"""
+Period detection on hashlife quadtrees.
+
+Thanks to hash-consing, two identical patterns are the same node, so
+finding a cycle is a dict lookup instead of a comparison of boards.
+To also catch spaceships, every generation is reduced to a canonical
+node: the smallest window (see `hashlife.window`) with its top-left
+corner at the top-left corner of the bounding box. A pattern and any
+translated copy give the same canonical node, and the shift between
+the two bounding boxes is the displacement.
+
+Nothing is ever expanded, so patterns far larger than a dense board
+can be analysed (the cost follows the number of distinct nodes).
+
+`sample` records the population and bounding box of a long run at a
+schedule of generations (see `linear_schedule` and `exponential_schedule`),
+jumping from one sample to the next.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from gol.hl.hashlife import (
+    centre, inner, is_padded, successor, bounding_box, window, maybe_collect
+)
+
+Period = namedtuple("Period", ["period", "displacement", "transient"])
+Samples = namedtuple("Samples", ["generations", "population", "bbox", "empty"])
+
+
+def canonical(node, x=0, y=0):
+    """
+    The canonical node of the pattern of `node` (with its top-left corner
+    at (x, y)) and the position of its bounding box, or (None, None)
+    if the pattern is empty.
+    """
+    box = bounding_box(node)
+    if box is None:
+        return None, None
+    x1, x2, y1, y2 = box
+    k = max(x2 - x1, y2 - y1).bit_length()
+    return window(node, x1, y1, k), (x + x1, y + y1)
+
+
+def step_one(node, x=0, y=0):
+    """
+    Advance `node` (with its top-left corner at (x, y)) by one generation.
+    Returns the new node and the position of its top-left corner
+    (the same position, unless the node had to be padded).
+    """
+    while node.k < 3 or not is_padded(node):
+        half = 1 << (node.k - 1)
+        node, x, y = centre(node), x - half, y - half
+    # the successor of the centred node covers the same area
+    return successor(centre(node), 0), x, y
+
+
+def find_period(node, max_gens=1000, x=0, y=0):
+    """
+    Step `node` generation by generation, until a pattern repeats
+    (possibly translated). Returns Period(period, displacement, transient):
+    the pattern at generation `transient + period` is the pattern at
+    generation `transient` moved by `displacement` (dx, dy).
+    Still lifes have period 1 and oscillators a (0, 0) displacement;
+    a pattern that dies out has period 1 from the generation it is empty.
+    Returns None if nothing repeats within `max_gens` generations.
+    """
+    seen = {}  # canonical node -> (generation, bounding box position)
+    for gen in range(max_gens + 1):
+        key, pos = canonical(node, x, y)
+        if key in seen:
+            first, first_pos = seen[key]
+            if pos is None:
+                return Period(gen - first, (0, 0), first)
+            return Period(gen - first, (pos[0] - first_pos[0], pos[1] - first_pos[1]), first)
+        seen[key] = (gen, pos)
+        node, x, y = step_one(node, x, y)
+    return None
+
+
+def linear_schedule(stop, step=1, start=0):
+    """The generations start, start + step, ... up to `stop` (included)."""
+    return np.arange(start, stop + 1, step, dtype=np.int64)
+
+
+def exponential_schedule(stop, base=2):
+    """The generations 0 and the powers of `base` (rounded, without repeats)
+    up to `stop` (included)."""
+    assert base > 1
+    count = int(np.log(max(stop, 1)) / np.log(base)) + 2
+    gens = np.unique(np.round(base ** np.arange(count, dtype=float)).astype(np.int64))
+    return np.concatenate([[0], gens[gens <= stop]])
+
+
+def jump(node, n, x=0, y=0):
+    """
+    Advance `node` (with its top-left corner at (x, y)) by n generations,
+    like `hashlife.advance`, but keeping track of the position: returns the
+    new (cropped) node and the position of its top-left corner.
+    """
+    if n == 0:
+        return node, x, y
+    while node.k < 3 or not is_padded(node):
+        half = 1 << (node.k - 1)
+        node, x, y = centre(node), x - half, y - half
+    bits = n.bit_length()
+    for _ in range(bits):
+        half = 1 << (node.k - 1)
+        node, x, y = centre(node), x - half, y - half
+    for j in reversed(range(bits)):
+        if n >> j & 1:
+            # the successor is the central half
+            quarter = 1 << (node.k - 2)
+            node, x, y = successor(node, j), x + quarter, y + quarter
+            maybe_collect(node)
+    while node.k > 3 and is_padded(node):
+        quarter = 1 << (node.k - 2)
+        node, x, y = inner(node), x + quarter, y + quarter
+    return node, x, y
+
+
+def sample(node, generations, x=0, y=0):
+    """
+    The population and bounding box of `node` (with its top-left corner at
+    (x, y)) at each of the (increasing) `generations`.
+    Returns Samples(generations, population, bbox, empty), as arrays:
+    `bbox` has one int64 (x1, x2, y1, y2) row per sample (inclusive, in the
+    coordinates of `node`), zeros where `empty` (no cells left).
+    Each sample is advanced from the previous one (not from `node`), and
+    evenly spaced samples reuse the successor table of their step size.
+    """
+    generations = np.asarray(generations, dtype=np.int64)
+    assert np.all(np.diff(generations) >= 0) and (len(generations) == 0 or generations[0] >= 0)
+    population = np.zeros(len(generations), dtype=np.int64)
+    bbox = np.zeros((len(generations), 4), dtype=np.int64)
+    empty = np.ones(len(generations), dtype=bool)
+    gen = 0
+    for i, target in enumerate(generations.tolist()):
+        node, x, y = jump(node, target - gen, x, y)
+        gen = target
+        population[i] = node.n
+        box = bounding_box(node)
+        if box is not None:
+            x1, x2, y1, y2 = box
+            bbox[i] = (x + x1, x + x2, y + y1, y + y2)
+            empty[i] = False
+    return Samples(generations, population, bbox, empty)
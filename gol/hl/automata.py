@@ -0,0 +1,219 @@
+"""
+The `Automata` interface (see `gol.pure.automata`) on top of hashlife.
+
+`HashlifeAutomata` takes the same board, neighborhood, rule and torus
+arguments, and has the methods the drivers use (`advance`, `get_board_numpy`,
+`set_board`, `get_cycle_period`, `benchmark`, `animate`, ...), so a driver switches to
+hashlife by constructing it instead of `Automata`:
+* torus boards (power of 2 sizes) run with `advance_torus`
+* other boards run with `advance_bounded` (cells outside are dead,
+  like the 'fill' boundary of `Automata(torus=False)`)
+The board is a quadtree node with the board at its top-left corner:
+long runs cost the number of distinct blocks met, not the board size,
+and two identical boards are the same node (see `get_cycle_period`).
+Only the Moore neighborhood (3x3, without the centre) is supported.
+"""
+import time
+import numpy as np
+from PIL import Image
+from matplotlib import pyplot as plt, animation
+from tqdm import tqdm
+
+from gol.hl.hashlife import (
+    construct_from_array, expand_raster, advance_torus, advance_bounded, set_rule,
+    register_root, unregister_root
+)
+
+MOORE = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
+
+
+class HashlifeAutomata:
+    '''
+    board: initial configuration (binary, square)
+    neighborhood: must be the Moore neighborhood (see `MOORE`)
+    torus: rolling over the boundaries (the size must be a power of 2)
+    rule[0]: '1->1' based on "1" neighbours
+    rule[1]: '0->1' based on "1" neighbours (can't contain 0)
+    '''
+    def __init__(self, board, neighborhood=MOORE, rule=((2, 3), (3,)), torus=True):
+        assert np.array_equal(neighborhood, MOORE), "hashlife only supports the Moore neighborhood"
+        self.neighborhood = neighborhood
+        self.rule = rule
+        self.torus = torus
+        self._node = None
+        self.set_board(board)
+
+    def __del__(self):
+        if self._node is not None:
+            unregister_root(self._node)
+
+    @property
+    def node(self):
+        return self._node
+
+    @node.setter
+    def node(self, node):
+        # the board survives `hashlife.collect` (and stays canonical)
+        register_root(node)
+        if self._node is not None:
+            unregister_root(self._node)
+        self._node = node
+
+    def _run(self, step, *args):
+        # the successor tables of `self.rule` (see `hashlife.set_rule`)
+        previous = set_rule(self.rule)
+        try:
+            return step(*args)
+        finally:
+            set_rule(previous)
+
+    def set_board(self, board):
+        board = np.asarray(board)
+        self.size, _, = self.height, self.width = self.shape = board.shape
+        assert self.height == self.width
+        if self.torus:
+            assert self.size & (self.size - 1) == 0, "torus size must be a power of 2"
+            # a torus repeated is the same torus (the root is at least 4x4)
+            reps = max(4 // self.size, 1)
+            board = np.tile(board, (reps, reps))
+        self.node = construct_from_array(board, padded=False)
+
+    def set_random_board(self, density=0.5):
+        self.set_board(np.random.uniform(0, 1, self.shape) < density)
+
+    def get_board_numpy(self, change_to_bool=False, change_to_int=False):
+        result = expand_raster(self.node)[:self.height, :self.width]
+        if change_to_bool:
+            result = result.astype(bool)
+        elif change_to_int:
+            result = result.astype(int)
+        return result
+
+    @property
+    def board(self):
+        return self.get_board_numpy()
+
+    def get_board_pts(self, only_alive=True):
+        from gol.utils import get_board_pts
+        return get_board_pts(self.get_board_numpy(), only_alive=only_alive)
+
+    def update_board(self):
+        self.advance()
+
+    def animate(
+            self,
+            iterations=None,
+            name='animation',
+            interval=0,
+            progress=True):
+
+        self.animate_iter = 0
+
+        if progress:
+            bar = tqdm()
+
+        def update_animation(*args):
+            if self.animate_iter == iterations:
+                return None
+            self.animate_iter += 1
+
+            if progress:
+                bar.update()
+
+            self.update_board()
+            self.image.set_array(self.get_board_numpy())
+            return self.image
+
+        fig = plt.figure(name)
+        plt.axis("off")
+
+        # first frame
+        self.image = plt.imshow(
+            self.get_board_numpy(),
+            interpolation="nearest",
+            cmap=plt.cm.gray
+        )
+
+        _ = animation.FuncAnimation(
+            fig,
+            update_animation,
+            interval=interval, # ms
+            cache_frame_data=False
+        )
+
+        # always force show
+        plt.show()
+
+    '''
+    Multi-Step update function: exactly `iterations` generations,
+    in O(log(iterations)) successor steps
+    '''
+    def advance(self, iterations=1):
+        if self.torus:
+            self.node = self._run(advance_torus, self.node, iterations)
+        else:
+            self.node = self._run(advance_bounded, self.node, iterations, self.size)
+
+    '''
+    Main Benchmark (same output as `Automata.benchmark`)
+    '''
+    def benchmark(self, iterations):
+        start = time.process_time()
+        self.advance(iterations)
+        ellapsed = time.process_time() - start
+
+        hz = iterations / ellapsed if ellapsed else float('inf')
+        hz_B_cell = hz * self.size * self.size / 10 ** 9 # Billions
+        shape_str = f'{self.size}x{self.size}'
+
+        print(
+            'Device: Hashlife\n',
+            'Benchmark Quadtree:',
+            f'{shape_str} grid,',
+            f'{iterations} iters,',
+            f'torus={self.torus}\n',
+            f'{hz:.0f} Hz (board)\n',
+            f'{ellapsed:.1f} s (cells)\n',
+            f'{hz_B_cell:.2f} BHz (per cell)'
+        )
+
+    def save_last_frame(self, filename, grid=False):
+        # (`grid` is accepted like `Automata.save_last_frame`, but no grid
+        # lines are drawn)
+        board_np = self.get_board_numpy()
+        if filename.endswith('npy'):
+            np.save(filename, board_np)
+        else:
+            Image.fromarray(board_np.astype(np.uint8) * 255, mode='L').save(filename)
+
+    def show_current_frame(self, name, force_show=True):
+        plt.figure(name, figsize=(5, 5))
+        plt.imshow(
+            self.get_board_numpy(),
+            interpolation="nearest",
+            cmap=plt.cm.gray
+        )
+        plt.axis("off")
+
+        if force_show:
+            plt.show()
+
+    '''
+    Get the period of the cycle (same as `Automata.get_cycle_period`)
+    Identical boards are the same node: each generation is compared
+    with the first one in constant time
+    '''
+    def get_cycle_period(self, advance_gen=100, max_period=1000):
+        if advance_gen:
+            self.advance(advance_gen)
+        first_node = self.node
+        # keep it canonical (see `hashlife.collect`) once the board moves on
+        register_root(first_node)
+        try:
+            for p in range(1, max_period + 1):
+                self.advance()
+                if self.node is first_node:
+                    return p
+        finally:
+            unregister_root(first_node)
+        return None # no cycle found (up to max_period)
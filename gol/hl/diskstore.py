@@ -0,0 +1,429 @@
+"""
+Persistent, memory-mapped store of hashlife successor results.
+
+The `successor` tables of `hashlife.py` are lost when the process exits.
+A `DiskStore` keeps them in a single file across runs:
+* node records (level >= 3): the structural `hash` of the node, its level
+  `k` and its four children, as record numbers (-1 for an empty child),
+  or as 16-bit cell masks for a level-3 node
+* successor records: (node record, step size `j`, result record, stamp)
+* two open-addressing tables (on the node hash, and on the node record
+  and `j`) to find them without reading the whole file
+* the rule of the successors (see `hashlife.set_rule`): a store only
+  opens, and only serves lookups, under that rule
+Node hashes only depend on the structure of the nodes, so the keys are
+the same in every process.
+
+The file is memory-mapped: opening it is immediate, and lookups only read
+the pages they touch. Any number of workers can open it with
+`readonly=True`; `save` (single writer) writes a new file next to it and
+atomically replaces the old one, so readers keep a consistent view (until
+they `reload`).
+
+Usage:
+
+    store = DiskStore("successors.hls", max_mb=512)
+    use_store(store)        # `successor` misses now look in the store
+    node, gens = ffwd(node, 100)
+    store.save()            # add the new successor results to the file
+
+A `SharedStore` holds the same records in a block of shared memory,
+for a pool of worker processes (see below).
+"""
+import os
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+
+from gol.hl.hashlife import (
+    join, get_zero, from_cells, successor_items, get_rule, rule_string
+)
+from gol.hl.hashlife_array import _mix, _mix_np, _fill_table, _EMPTY
+
+MAGIC = b"HLSTORE2"
+HEADER_BYTES = 128
+# the B/S string of the rule, after the magic and the 5 counts
+RULE_OFFSET = 48
+
+NODE_DTYPE = np.dtype([("hash", "<u8"), ("k", "<i8"), ("children", "<i8", (4,))])
+SUCC_DTYPE = np.dtype([("node", "<i8"), ("j", "<i8"), ("result", "<i8"), ("stamp", "<i8")])
+
+
+def _slots(count):
+    """Size of an open-addressing table for `count` keys (at most half full)."""
+    size = 2
+    while size < 2 * count:
+        size *= 2
+    return size
+
+
+def _succ_keys(nodes, js):
+    return _mix_np(nodes.astype(np.uint64) * np.uint64(64) + js.astype(np.uint64))
+
+
+def _check_rule(rule):
+    """Raise if the successors of `rule` are not those of the current rule."""
+    current = rule_string(get_rule())
+    if rule != current:
+        raise ValueError(f"store of rule {rule}, but the current rule is {current}")
+
+
+def _layout(nodes, succs, stamp, rule):
+    """The header and the arrays of a store of `rule` holding these records."""
+    node_index = _fill_table(_mix_np(nodes["hash"]), _slots(len(nodes)))
+    succ_index = _fill_table(_succ_keys(succs["node"], succs["j"]), _slots(len(succs)))
+    header = MAGIC + np.array(
+        [len(nodes), len(node_index), len(succs), len(succ_index), stamp], dtype="<i8"
+    ).tobytes() + rule.encode("ascii")
+    assert len(header) <= HEADER_BYTES
+    return header.ljust(HEADER_BYTES, b"\0"), [nodes, node_index, succs, succ_index]
+
+
+def _read_header(header):
+    """(array dtypes and lengths, stamp, rule) of a store header."""
+    if bytes(header[:8]) != MAGIC:
+        raise ValueError("not a hashlife store")
+    n_nodes, node_slots, n_succ, succ_slots, stamp = np.frombuffer(
+        header, dtype="<i8", count=5, offset=8
+    ).tolist()
+    rule = bytes(header[RULE_OFFSET:HEADER_BYTES]).rstrip(b"\0").decode("ascii")
+    return [
+        (NODE_DTYPE, n_nodes), (np.int32, node_slots), (SUCC_DTYPE, n_succ), (np.int32, succ_slots)
+    ], stamp, rule
+
+
+def file_bytes(n_nodes, n_succ):
+    """Size of a store file with `n_nodes` and `n_succ` records."""
+    return (
+        HEADER_BYTES
+        + n_nodes * NODE_DTYPE.itemsize + 4 * _slots(n_nodes)
+        + n_succ * SUCC_DTYPE.itemsize + 4 * _slots(n_succ)
+    )
+
+
+class DiskStore:
+    """
+    A memory-mapped file of node definitions and successor results
+    (see the module docstring). Only nodes of level `min_level` and above
+    are stored (smaller successors are cheaper to compute than to look up).
+    The store belongs to the current rule (that of the file, if it exists):
+    opening it under another rule raises a ValueError.
+    `max_mb` caps the size of the file: `save` evicts the successor results
+    that were least recently written or used (lowest levels first), and
+    the nodes only they needed.
+    """
+
+    def __init__(self, path, readonly=False, max_mb=None, min_level=5):
+        assert min_level >= 4, "results must be level 3 or above"
+        self.path = path
+        self.readonly = readonly
+        self.max_bytes = None if max_mb is None else int(max_mb * 2 ** 20)
+        self.min_level = min_level
+        self.hits = 0
+        self.misses = 0
+        self.reload()
+
+    def reload(self):
+        """Map the current file (a store saved by another process is seen
+        after this). Raises a ValueError if it is a store of another rule."""
+        self._used = set()  # successor records read since the last save
+        if not os.path.exists(self.path):
+            self._empty()
+            return
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+        try:
+            arrays, self.stamp, self.rule = _read_header(header)
+        except ValueError:
+            raise ValueError(f"{self.path} is not a hashlife store")
+        _check_rule(self.rule)
+        offset = HEADER_BYTES
+        maps = []
+        for dtype, count in arrays:
+            maps.append(
+                np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+                if count else np.zeros(0, dtype=dtype)
+            )
+            offset += np.dtype(dtype).itemsize * count
+        self._set_arrays(maps)
+
+    def _empty(self):
+        self.stamp = 0
+        self.rule = rule_string(get_rule())
+        self._set_arrays([
+            np.zeros(0, dtype=NODE_DTYPE), np.full(2, _EMPTY, dtype=np.int32),
+            np.zeros(0, dtype=SUCC_DTYPE), np.full(2, _EMPTY, dtype=np.int32),
+        ])
+
+    def _set_arrays(self, arrays):
+        self.nodes, self.node_index, self.succs, self.succ_index = arrays
+        self._hash = self.nodes["hash"]
+        self._k = self.nodes["k"]
+        self._children = self.nodes["children"]
+
+    def __len__(self):
+        """Number of successor results in the store."""
+        return len(self.succs)
+
+    def find(self, node):
+        """The record number of `node`, or -1 if it is not stored."""
+        if node.k < 3 or not len(self.nodes):
+            return -1
+        size = len(self.node_index)
+        slot = _mix(node.hash) & (size - 1)
+        while True:
+            i = int(self.node_index[slot])
+            if i == _EMPTY:
+                return -1
+            if int(self._hash[i]) == node.hash and int(self._k[i]) == node.k:
+                refs = self._children[i].tolist()
+                quads = (node.a, node.b, node.c, node.d)
+                if node.k == 3:
+                    if refs == [q.cells for q in quads]:
+                        return i
+                elif all(
+                    q.n == 0 if r < 0 else int(self._hash[r]) == q.hash
+                    for r, q in zip(refs, quads)
+                ):
+                    return i
+            slot = (slot + 1) & (size - 1)
+
+    def node(self, i, k, memo=None):
+        """The node of record `i` (an empty level-`k` node if `i` is -1),
+        built through `join`."""
+        if i < 0:
+            return get_zero(k)
+        memo = {} if memo is None else memo
+        node = memo.get(i)
+        if node is None:
+            k = int(self._k[i])
+            refs = self._children[i].tolist()
+            if k == 3:
+                node = join(*[from_cells(cells, 2) for cells in refs])
+            else:
+                node = join(*[self.node(r, k - 1, memo) for r in refs])
+            memo[i] = node
+        return node
+
+    def _find_successor(self, i, j):
+        size = len(self.succ_index)
+        slot = _mix(i * 64 + j) & (size - 1)
+        while True:
+            e = int(self.succ_index[slot])
+            if e == _EMPTY:
+                return -1
+            if int(self.succs["node"][e]) == i and int(self.succs["j"][e]) == j:
+                return e
+            slot = (slot + 1) & (size - 1)
+
+    def successor(self, m, j):
+        """The stored successor of `m` (2**j generations), or None."""
+        if m.k < self.min_level or not len(self.succs):
+            return None
+        i = self.find(m)
+        e = -1 if i < 0 else self._find_successor(i, j)
+        if e < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add(e)
+        return self.node(int(self.succs["result"][e]), m.k - 1)
+
+    def save(self):
+        """
+        Add the successor results of the hashlife tables (of nodes of level
+        `min_level` and above) to the file, evict down to `max_mb` if needed,
+        and atomically replace the file.
+        """
+        assert not self.readonly, "read-only store"
+        _check_rule(self.rule)
+        nodes, succs, stamp = self._records()
+        if self.max_bytes is not None and file_bytes(len(nodes), len(succs)) > self.max_bytes:
+            nodes, succs = self._evict(nodes, succs)
+        self._write(nodes, succs, stamp)
+        self.reload()
+
+    def _records(self):
+        """The node and successor records of the store, with the successor
+        results of the hashlife tables added, and the new stamp."""
+        stamp = self.stamp + 1
+        hashes, levels, children = [], [], []
+        numbers = {}  # node -> record number, for the nodes added by this save
+        base = len(self.nodes)
+
+        def record(node):
+            # record number of `node`, adding it (and its children) if needed
+            stack = [node]
+            while stack:
+                m = stack[-1]
+                if m in numbers:
+                    stack.pop()
+                    continue
+                i = self.find(m)
+                if i >= 0:
+                    numbers[m] = i
+                    stack.pop()
+                    continue
+                quads = (m.a, m.b, m.c, m.d)
+                if m.k == 3:
+                    refs = [q.cells for q in quads]
+                else:
+                    pending = [q for q in quads if q.n > 0 and q not in numbers]
+                    if pending:
+                        stack.extend(pending)
+                        continue
+                    refs = [numbers[q] if q.n > 0 else -1 for q in quads]
+                stack.pop()
+                numbers[m] = base + len(hashes)
+                hashes.append(m.hash)
+                levels.append(m.k)
+                children.append(refs)
+            return numbers[node]
+
+        entries = []
+        seen = set()
+        for m, j, s in successor_items():
+            if m.k < self.min_level or m.n == 0:
+                continue
+            i = record(m)
+            if (i, j) in seen or (i < base and self._find_successor(i, j) >= 0):
+                continue
+            seen.add((i, j))
+            entries.append((i, j, record(s) if s.n > 0 else -1, stamp))
+
+        nodes = np.zeros(base + len(hashes), dtype=NODE_DTYPE)
+        nodes[:base] = self.nodes
+        nodes["hash"][base:] = hashes
+        nodes["k"][base:] = levels
+        nodes["children"][base:] = np.array(children, dtype=np.int64).reshape(-1, 4)
+        succs = np.zeros(len(self.succs) + len(entries), dtype=SUCC_DTYPE)
+        succs[:len(self.succs)] = self.succs
+        if entries:
+            new = np.array(entries, dtype=np.int64)
+            for col, name in enumerate(["node", "j", "result", "stamp"]):
+                succs[name][len(self.succs):] = new[:, col]
+        if self._used:
+            succs["stamp"][sorted(self._used)] = stamp
+        return nodes, succs, stamp
+
+    def _evict(self, nodes, succs):
+        """Keep the most recent successor results (highest levels first)
+        that fit in `max_bytes`, with the nodes they need."""
+        order = np.lexsort((-nodes["k"][succs["node"]], -succs["stamp"]))
+        marked = np.zeros(len(nodes), dtype=bool)
+        n_nodes = 0
+        keep = []
+        for e in order.tolist():
+            stack = [r for r in (int(succs["node"][e]), int(succs["result"][e])) if r >= 0]
+            added = []
+            while stack:
+                r = stack.pop()
+                if marked[r]:
+                    continue
+                marked[r] = True
+                added.append(r)
+                if nodes["k"][r] > 3:
+                    stack.extend(c for c in nodes["children"][r].tolist() if c >= 0)
+            if file_bytes(n_nodes + len(added), len(keep) + 1) > self.max_bytes:
+                marked[added] = False
+                break
+            n_nodes += len(added)
+            keep.append(e)
+
+        # compact, renumbering the records
+        renumber = np.cumsum(marked) - 1
+        nodes = nodes[marked]
+        # (children of level-3 nodes are cell masks)
+        inner = (nodes["k"] > 3)[:, None] & (nodes["children"] >= 0)
+        nodes["children"] = np.where(inner, renumber[np.where(inner, nodes["children"], 0)], nodes["children"])
+        succs = succs[np.sort(np.array(keep, dtype=np.int64))]
+        succs["node"] = renumber[succs["node"]]
+        succs["result"] = np.where(succs["result"] >= 0, renumber[np.maximum(succs["result"], 0)], -1)
+        return nodes, succs
+
+    def _write(self, nodes, succs, stamp):
+        header, arrays = _layout(nodes, succs, stamp, self.rule)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            for array in arrays:
+                f.write(array.tobytes())
+        os.replace(tmp, self.path)
+
+
+class SharedStore(DiskStore):
+    """
+    The records of a `DiskStore` in a block of shared memory, warmed once
+    by a parent process and read in place by its workers:
+
+        # parent, after warming up its tables (e.g., on common soups)
+        store = SharedStore()
+        # each worker (e.g., in a pool initializer), fork or spawn
+        use_store(SharedStore(store.name))
+        ...
+        store.unlink()          # parent, once the pool is done
+
+    The block only holds NumPy records (no Python objects, so no reference
+    counts to update): the workers share its pages instead of copying them.
+    The nodes built from it and the results a worker computes itself go
+    to the worker's own tables (its private overflow). The block is
+    read-only; a new `SharedStore` publishes newer results. Like a
+    `DiskStore`, it belongs to the rule it was created under: the workers
+    must `set_rule` before attaching.
+    """
+
+    def __init__(self, name=None, min_level=5):
+        assert min_level >= 4, "results must be level 3 or above"
+        self.path = None
+        self.readonly = True
+        self.max_bytes = None
+        self.min_level = min_level
+        self.hits = 0
+        self.misses = 0
+        if name is None:
+            # copy the successor results of the hashlife tables
+            self._used = set()
+            self._empty()
+            header, arrays = _layout(*self._records(), self.rule)
+            size = len(header) + sum(array.nbytes for array in arrays)
+            self._shm = SharedMemory(create=True, size=size)
+            self._shm.buf[:len(header)] = header
+            offset = len(header)
+            for array in arrays:
+                self._shm.buf[offset:offset + array.nbytes] = array.tobytes()
+                offset += array.nbytes
+        else:
+            # (the workers of a `multiprocessing` pool share the resource
+            # tracker of the parent: attaching does not make them owners)
+            self._shm = SharedMemory(name=name)
+        self.name = self._shm.name
+        try:
+            self.reload()
+        except ValueError:
+            self._shm.close()
+            raise
+
+    def reload(self):
+        """Map the records of the block. Raises a ValueError if they are
+        the successors of another rule."""
+        self._used = set()
+        buf = self._shm.buf
+        arrays, self.stamp, self.rule = _read_header(buf[:HEADER_BYTES])
+        _check_rule(self.rule)
+        offset = HEADER_BYTES
+        views = []
+        for dtype, count in arrays:
+            view = np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+            view.flags.writeable = False
+            views.append(view)
+            offset += np.dtype(dtype).itemsize * count
+        self._set_arrays(views)
+
+    def close(self):
+        """Detach from the block (the store is empty afterwards)."""
+        self._empty()
+        self._shm.close()
+
+    def unlink(self):
+        """Free the block (parent only, once no worker needs it)."""
+        self.close()
+        self._shm.unlink()
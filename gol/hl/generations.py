@@ -0,0 +1,331 @@
+"""
+Hashlife for Generations rules (cells with more than two states).
+
+A Generations rule has `states` cell states: 0 is dead, 1 is alive and
+2 .. states - 1 are dying. Only alive cells count as neighbours:
+* a dead cell is born (-> 1) if its number of alive neighbours is in `born`
+* an alive cell stays alive if it is in `survive`, else starts dying (-> 2)
+* a dying cell moves to the next state, and is dead after the last one
+With `states=2` this is the Life-like rule [survive, born]
+(see `hashlife.set_rule`).
+
+Same algorithm as `hashlife.py` (hash-consed nodes, one successor table per
+step size), but a leaf (k=0) holds a state, and every node counts its cells
+in each state. The base case (a 4x4 node) looks up the next state of each
+of its four central cells in a precomputed table:
+(state, number of alive neighbours) -> next state.
+
+Usage:
+
+    gl = GenerationsLife(rule=[[3, 4, 5], [2]], states=4)  # Star Wars
+    node = gl.construct_from_array(board)   # board[y, x] is a state
+    node = gl.advance(node, 1000)
+    node.counts                             # number of cells per state
+    board = gl.expand_array(node)
+"""
+from collections import defaultdict
+
+import numpy as np
+
+mask = (1 << 63) - 1
+
+
+class GenNode:
+    """
+    A quadtree node of `GenerationsLife`: level `k`, children `a, b, c, d`
+    (None for a leaf, whose cell is `state`), `n` cells not dead and
+    `counts[s]` cells in state s (for every state, 0 included).
+    """
+    __slots__ = ["k", "a", "b", "c", "d", "n", "counts", "hash", "state"]
+
+    def __init__(self, k, counts, hash, a=None, b=None, c=None, d=None, state=None):
+        self.k = k
+        self.a, self.b, self.c, self.d = a, b, c, d
+        self.counts = counts
+        self.n = (1 << 2 * k) - counts[0]
+        self.hash = hash
+        self.state = state
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        size = 1 << self.k
+        return f"Node k={self.k}, {size} x {size}, population {self.n}, states {self.counts}"
+
+
+def transition_table(rule, states):
+    """
+    The next state of a cell: `table[state][alive]`, for every state and
+    number of alive neighbours (0 to 8).
+    """
+    survive, born = rule
+    assert states >= 2, "at least the dead and alive states"
+    # (empty nodes must stay empty)
+    assert 0 not in born, "B0 rules are not supported"
+    dying = 2 if states > 2 else 0
+    table = [[1 if n in born else 0 for n in range(9)]]
+    table.append([1 if n in survive else dying for n in range(9)])
+    for state in range(2, states):
+        table.append([(state + 1) % states] * 9)
+    return table
+
+
+class GenerationsLife:
+    """
+    Hashlife engine for the Generations rule `rule` ([[survive], [born]],
+    like `Automata`) with `states` cell states.
+    Nodes are `GenNode`s, created by `leaf` and `join` only (so identical
+    patterns are the same node).
+    """
+
+    def __init__(self, rule=((2, 3), (3,)), states=3):
+        self.rule = rule
+        self.states = states
+        self.table = transition_table(rule, states)
+        self._nodes = {}  # (a, b, c, d) -> node
+        self._successors = defaultdict(dict)  # j -> {node: successor node}
+        # bookkeeping (same meaning as `lru_cache.cache_info`)
+        self.hits = self.misses = 0
+        self._leaves = [
+            GenNode(0, tuple(int(s == t) for t in range(states)), s, state=s)
+            for s in range(states)
+        ]
+        self._zeros = [self._leaves[0]]
+
+    def cache_info(self):
+        """(hits, misses, nodes, successors) of the successor table."""
+        successors = sum(len(table) for table in self._successors.values())
+        return self.hits, self.misses, len(self._nodes), successors
+
+    #####################
+    # CONSTRUCTORS
+    #
+    def leaf(self, state):
+        """The level-0 node of a cell in `state`."""
+        return self._leaves[state]
+
+    def join(self, a, b, c, d):
+        """The (unique) node with children `a, b, c, d`."""
+        key = (a, b, c, d)
+        node = self._nodes.get(key)
+        if node is None:
+            nhash = (
+                a.k
+                + 2
+                + 5131830419411 * a.hash
+                + 3758991985019 * b.hash
+                + 8973110871315 * c.hash
+                + 4318490180473 * d.hash
+            ) & mask
+            nhash = ((nhash ^ (nhash >> 29)) * 0xBF58476D1CE4E5B9) & mask
+            counts = tuple(map(sum, zip(a.counts, b.counts, c.counts, d.counts)))
+            node = self._nodes[key] = GenNode(a.k + 1, counts, nhash, a, b, c, d)
+        return node
+
+    def get_zero(self, k):
+        """An empty (all dead) node at level `k`."""
+        while len(self._zeros) <= k:
+            z = self._zeros[-1]
+            self._zeros.append(self.join(z, z, z, z))
+        return self._zeros[k]
+
+    def construct(self, cells):
+        """
+        Turn a list of (x, y, state) cells into a quadtree and return the
+        (padded) top-level node, like `hashlife.construct`.
+        """
+        cells = [(x, y, s) for x, y, s in cells if s]
+        if not cells:
+            return self.pad(self.get_zero(3))
+        min_x = min(x for x, y, s in cells)
+        min_y = min(y for x, y, s in cells)
+        pattern = {(x - min_x, y - min_y): self.leaf(s) for x, y, s in cells}
+        k = 0
+        while len(pattern) != 1 or k < 3:
+            next_level = {}
+            z = self.get_zero(k)
+            while pattern:
+                x, y = next(iter(pattern))
+                x, y = x - (x & 1), y - (y & 1)
+                a = pattern.pop((x, y), z)
+                b = pattern.pop((x + 1, y), z)
+                c = pattern.pop((x, y + 1), z)
+                d = pattern.pop((x + 1, y + 1), z)
+                next_level[x >> 1, y >> 1] = self.join(a, b, c, d)
+            pattern = next_level
+            k += 1
+        return self.pad(pattern.popitem()[1])
+
+    def construct_from_array(self, board):
+        """The quadtree of a dense board of states (`board[y, x]`)."""
+        ys, xs = np.nonzero(board)
+        return self.construct(zip(xs.tolist(), ys.tolist(), board[ys, xs].tolist()))
+    #
+    # CONSTRUCTORS
+    #####################
+
+    #####################
+    # DECONSTRUCTORS
+    #
+    def expand(self, node, x=0, y=0):
+        """The (x, y, state) of the cells of `node` that are not dead."""
+        cells = []
+        stack = [(node, x, y)]
+        while stack:
+            node, x, y = stack.pop()
+            if node.n == 0:
+                continue
+            if node.k == 0:
+                cells.append((x, y, node.state))
+                continue
+            half = 1 << (node.k - 1)
+            stack.extend([
+                (node.d, x + half, y + half), (node.c, x, y + half),
+                (node.b, x + half, y), (node.a, x, y),
+            ])
+        return cells
+
+    def expand_array(self, node):
+        """The dense 2**k x 2**k board of states of `node`."""
+        size = 1 << node.k
+        board = np.zeros((size, size), dtype=np.int64)
+        cells = self.expand(node)
+        if cells:
+            xs, ys, states = np.array(cells).T
+            board[ys, xs] = states
+        return board
+    #
+    # DECONSTRUCTORS
+    #####################
+
+    #####################
+    # STATIC OPERATIONS
+    #
+    def centre(self, m):
+        """Return a node at level `k+1`, centered on the given node."""
+        z = self.get_zero(m.a.k)
+        join = self.join
+        return join(
+            join(z, z, z, m.a), join(z, z, m.b, z), join(z, m.c, z, z), join(m.d, z, z, z)
+        )
+
+    def inner(self, m):
+        """Return the central portion of a node -- the inverse of centre()."""
+        return self.join(m.a.d, m.b.c, m.c.b, m.d.a)
+
+    def is_padded(self, m):
+        """True if the pattern is surrounded by at least one sub-sub-block of
+        dead cells."""
+        return (
+            m.a.n == m.a.d.d.n
+            and m.b.n == m.b.c.c.n
+            and m.c.n == m.c.b.b.n
+            and m.d.n == m.d.a.a.n
+        )
+
+    def crop(self, m):
+        """Repeatedly take the inner node, until all padding is removed."""
+        while m.k > 3 and self.is_padded(m):
+            m = self.inner(m)
+        return m
+
+    def pad(self, m):
+        """Repeatedly centre a node, until it is fully padded."""
+        while m.k <= 3 or not self.is_padded(m):
+            m = self.centre(m)
+        return m
+
+    def _step_4x4(self, m):
+        """The 2x2 centre of the 4x4 node `m`, one generation later."""
+        grid = [[None] * 4 for _ in range(4)]
+        for q, (qx, qy) in zip([m.a, m.b, m.c, m.d], [(0, 0), (2, 0), (0, 2), (2, 2)]):
+            for cell, (cx, cy) in zip([q.a, q.b, q.c, q.d], [(0, 0), (1, 0), (0, 1), (1, 1)]):
+                grid[qy + cy][qx + cx] = cell.state
+        table = self.table
+        quads = []
+        for x, y in [(1, 1), (2, 1), (1, 2), (2, 2)]:
+            alive = sum(
+                grid[y + dy][x + dx] == 1 for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy
+            )
+            quads.append(self._leaves[table[grid[y][x]][alive]])
+        return self.join(*quads)
+
+    def successor(self, m, j=None):
+        """
+        Return the 2**k-1 x 2**k-1 successor, 2**j generations in the future,
+        where j <= k - 2, caching the result.
+        """
+        j = m.k - 2 if j is None else min(j, m.k - 2)
+        if m.n == 0:  # empty
+            return m.a
+        table = self._successors[j]
+        s = table.get(m)
+        if s is not None:
+            self.hits += 1
+            return s
+        self.misses += 1
+        if m.k == 2:  # base case
+            s = self._step_4x4(m)
+        else:
+            join, successor = self.join, self.successor
+            c1 = successor(join(m.a.a, m.a.b, m.a.c, m.a.d), j)
+            c2 = successor(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
+            c3 = successor(join(m.b.a, m.b.b, m.b.c, m.b.d), j)
+            c4 = successor(join(m.a.c, m.a.d, m.c.a, m.c.b), j)
+            c5 = successor(join(m.a.d, m.b.c, m.c.b, m.d.a), j)
+            c6 = successor(join(m.b.c, m.b.d, m.d.a, m.d.b), j)
+            c7 = successor(join(m.c.a, m.c.b, m.c.c, m.c.d), j)
+            c8 = successor(join(m.c.b, m.d.a, m.c.d, m.d.c), j)
+            c9 = successor(join(m.d.a, m.d.b, m.d.c, m.d.d), j)
+            if j < m.k - 2:
+                s = join(
+                    join(c1.d, c2.c, c4.b, c5.a),
+                    join(c2.d, c3.c, c5.b, c6.a),
+                    join(c4.d, c5.c, c7.b, c8.a),
+                    join(c5.d, c6.c, c8.b, c9.a),
+                )
+            else:
+                s = join(
+                    successor(join(c1, c2, c4, c5), j),
+                    successor(join(c2, c3, c5, c6), j),
+                    successor(join(c4, c5, c7, c8), j),
+                    successor(join(c5, c6, c8, c9), j),
+                )
+        table[m] = s
+        return s
+    #
+    # STATIC OPERATIONS
+    #####################
+
+    #####################
+    # TIME DYNAMICS
+    #
+    def advance(self, node, n):
+        """Advance node by exactly n generations, using
+        the binary expansion of n to find the correct successors"""
+        for j in reversed(range(n.bit_length())):
+            if n >> j & 1:
+                # like `ffwd`: spaceships can move at the speed of light,
+                # so every leap starts from the centre of a padded node
+                node = self.centre(self.pad(node))
+                while node.k - 3 < j:
+                    node = self.centre(node)
+                node = self.successor(node, j)
+        return self.crop(node)
+
+    def ffwd(self, node, n):
+        """Advance as quickly as possible, taking n giant leaps
+        (returns the node and the number of generations)"""
+        gens = 0
+        for i in range(n):
+            # unlike in Life, spaceships of Generations rules (e.g., Brian's
+            # Brain) can move at the speed of light: from the central quarter,
+            # 2**(k-3) generations stay in the (central half) successor
+            node = self.centre(self.pad(node))
+            gens += 1 << (node.k - 3)
+            node = self.successor(node, node.k - 3)
+        return node, gens
+    #
+    # TIME DYNAMICS
+    #####################
@@ -1,6 +1,7 @@
 from collections import namedtuple
+import time
 from functools import lru_cache
-from collections import Counter
+from collections import Counter, defaultdict
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -11,14 +12,17 @@ import matplotlib.pyplot as plt
 # `n` is the number of on cells in this node (useful for bookkeeping and display)
 # `hash` is a precomputed hash of this node
 # (if we don't do this, Python will recursively compute the hash every time it is needed!)
+# `cells` is the bit mask of the cells for small nodes (`k <= 2`, bit `y * 2**k + x`),
+# None otherwise
 class Node:
-    __slots__ = ["k", "a", "b", "c", "d", "n", "hash"]
+    __slots__ = ["k", "a", "b", "c", "d", "n", "hash", "cells"]
 
-    def __init__(self, k, n, hash, a=None, b=None, c=None, d=None):
+    def __init__(self, k, n, hash, a=None, b=None, c=None, d=None, cells=None):
         self.k = k
         self.n = n
         self.a, self.b, self.c, self.d = a,b,c,d
         self.hash = hash
+        self.cells = cells
 
     def size(self):
         return 1<<self.k
@@ -41,11 +45,50 @@ class Node:
         return f"Node k={self.k}, {self.size()} x {self.size()}, population {self.n}"
 
 # base level binary nodes
-on = Node(k=0, n=1, hash=1)
-off = Node(k=0, n=0, hash=0)
+on = Node(k=0, n=1, hash=1, cells=1)
+off = Node(k=0, n=0, hash=0, cells=0)
 
 mask = (1 << 63) - 1
 
+# The node table: structural hash -> node, never evicted,
+# so that there is exactly one node per pattern (hash-consing)
+# and caches keyed on nodes (e.g., `successor`) never miss on a copy.
+_nodes = {}
+# nodes whose hash collides with a different node in `_nodes`
+_collisions = {}
+_join_stats = {"hits": 0, "misses": 0, "duplicates": 0}
+
+JoinInfo = namedtuple("JoinInfo", ["hits", "misses", "currsize", "duplicates"])
+
+# The successor tables, one per step size: j -> {node: successor node}
+# (`j` is capped at `k - 2`, so giant leaps of a level-k node use table k - 2)
+_successors = defaultdict(dict)
+_successor_stats = {"hits": 0, "misses": 0}
+
+SuccessorInfo = namedtuple("SuccessorInfo", ["hits", "misses", "currsize"])
+# optional persistent store, looked up on successor misses (see `use_store`)
+_store = None
+
+# The current rule, [[survive], [born]] numbers of on neighbours
+# (see `set_rule`), and the successor state of the other rules used so far:
+# rule -> (successor tables, `_LIFE_4x4`, store, bounded successors)
+LIFE_RULE = ((2, 3), (3,))
+_rule = LIFE_RULE
+_other_rules = {}
+# per-level counters of `successor`, k -> [hits, misses, recomputed, seconds]
+# (None unless `instrument` is on), the successors dropped by `collect`
+# since then, as (hash, j), and the periodic callback (see `set_monitor`)
+_levels = None
+_evicted = set()
+_monitor = None
+
+# Small nodes (k=1 and k=2) are also interned by their cell mask
+# (`_small_nodes[k - 1][cells]`), so the base case of `successor`
+# is a lookup in `_LIFE_4x4` (see `life_4x4`)
+_small_nodes = [[None] * 16, [None] * 65536]
+# spread the 4 bits of a 2x2 mask to the top-left corner of a 4x4 mask
+_spread = [(m & 3) | (m & 12) << 2 for m in range(16)]
+
 #####################
 # CONSTRUCTORS
 #
@@ -85,6 +128,122 @@ def construct(pts):
         pattern = next_level
         k += 1
     return pad(pattern.popitem()[1])
+
+def construct_from_array(board, width=None, padded=True):
+    """
+    Turn a dense 2D board (`board[y, x]` is the cell at (x, y)) into a
+    quadtree and return the top-level (padded) Node.
+    `board` is either boolean (or 0/1), or bit-packed along the rows
+    (`np.packbits(board, axis=1)`) with `width` the number of columns.
+    If not `padded`, return the smallest root (at least 4x4) holding the
+    board at its top-left corner (e.g., the universe of `advance_torus`).
+    The tree is built level by level: all 4x4 blocks are encoded at once
+    as 16-bit cell masks, then every level groups 2x2 blocks, and only
+    the unique blocks of each level are turned into nodes.
+    """
+    board = np.asarray(board)
+    if width is not None:
+        board = np.unpackbits(board, axis=1, count=width)
+    board = board != 0
+    height, width = board.shape
+    size = 4
+    while size < max(height, width):
+        size *= 2
+    cells = np.zeros((size, size), dtype=np.int64)
+    cells[:height, :width] = board
+
+    # level 2: blocks[by, bx, y, x] -> 16-bit masks (bit `4 * y + x`)
+    blocks = cells.reshape(size // 4, 4, size // 4, 4).transpose(0, 2, 1, 3)
+    weights = 1 << np.arange(16, dtype=np.int64).reshape(4, 4)
+    codes, grid = np.unique((blocks * weights).sum(axis=(2, 3)), return_inverse=True)
+    nodes = [from_cells(code, 2) for code in codes.tolist()]
+    grid = grid.reshape(size // 4, size // 4)
+
+    # upper levels: each block is the 4 indices of its children
+    while len(grid) > 1:
+        quads = np.stack(
+            [grid[0::2, 0::2], grid[0::2, 1::2], grid[1::2, 0::2], grid[1::2, 1::2]],
+            axis=-1
+        )
+        codes, next_grid = np.unique(quads.reshape(-1, 4), axis=0, return_inverse=True)
+        nodes = [
+            join(nodes[a], nodes[b], nodes[c], nodes[d]) for a, b, c, d in codes.tolist()
+        ]
+        grid = next_grid.reshape(len(grid) // 2, len(grid) // 2)
+    return pad(nodes[grid[0, 0]]) if padded else nodes[grid[0, 0]]
+
+def morton(xs, ys):
+    """
+    Interleave the bits of non-negative coordinates (< 2**32) into
+    Morton (Z-order) codes: bit `2 * i` is bit `i` of x, bit `2 * i + 1` of y.
+    Children of a quadtree node then follow the `a, b, c, d` order.
+    """
+    codes = np.zeros(len(xs), dtype=np.uint64)
+    for coords, shift in [(xs, 0), (ys, 1)]:
+        v = np.asarray(coords, dtype=np.uint64)
+        assert not len(v) or int(v.max()) < 1 << 32, "Morton codes need coordinates below 2**32"
+        v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+        v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+        v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+        codes |= v << np.uint64(shift)
+    return codes
+
+# Morton code of a cell in a 4x4 block -> bit of the cell in the 16-bit mask
+_MORTON_BIT = [
+    4 * ((z >> 1 & 1) | (z >> 2 & 2)) + ((z & 1) | (z >> 1 & 2)) for z in range(16)
+]
+
+def construct_from_coords(xs, ys):
+    """
+    Turn arrays of x and y coordinates (of the on cells) into a quadtree.
+    Return the top-level (padded) Node and the (x, y) coordinates of
+    its top-left corner, so that `expand(node, x, y)` gives back the
+    original coordinates (no forcing of the pattern to (0, 0)).
+    The pattern must span less than 2**32 cells in each direction
+    (see `morton`).
+    Cells are sorted by Morton code, so every node is a contiguous run of
+    codes and each level is built in one linear pass: the 4x4 blocks
+    first (as 16-bit masks), then 2x2 groups of blocks up to the root.
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    if len(xs) == 0:
+        return pad(get_zero(2)), (0, 0)
+    x0, y0 = int(xs.min()), int(ys.min())
+    codes = np.unique(morton(xs - x0, ys - y0))
+
+    # level 2: one 16-bit mask per run of codes sharing `codes >> 4`
+    bits = np.left_shift(1, np.array(_MORTON_BIT)[codes & np.uint64(15)])
+    codes = codes >> np.uint64(4)
+    starts = np.flatnonzero(np.diff(codes, prepend=~codes[:1]))
+    masks = np.bitwise_or.reduceat(bits, starts)
+    codes = codes[starts]
+    nodes = [from_cells(cells, 2) for cells in masks.tolist()]
+
+    # upper levels: the children of a node are the run of codes sharing `codes >> 2`
+    k = 2
+    while len(nodes) > 1 or codes[0] != 0:
+        slots = (codes & np.uint64(3)).astype(np.int64)
+        codes = codes >> np.uint64(2)
+        starts = np.flatnonzero(np.diff(codes, prepend=~codes[:1]))
+        z = get_zero(k)
+        children = [[z, z, z, z] for _ in starts]
+        parents = np.cumsum(np.diff(codes, prepend=codes[:1]) != 0)
+        for parent, slot, node in zip(parents.tolist(), slots.tolist(), nodes):
+            children[parent][slot] = node
+        nodes = [join(a, b, c, d) for a, b, c, d in children]
+        codes = codes[starts]
+        k += 1
+
+    # pad, keeping track of the top-left corner
+    node = nodes[0]
+    while node.k <= 3 or not is_padded(node):
+        x0 -= 1 << (node.k - 1)
+        y0 -= 1 << (node.k - 1)
+        node = centre(node)
+    return node, (x0, y0)
 #
 # CONSTRUCTORS
 #####################
@@ -120,6 +279,154 @@ def expand(node, x=0, y=0, clip=None, level=0):
             + expand(node.c, x, y + offset, clip, level)
             + expand(node.d, x + offset, y + offset, clip, level)
         )
+
+# Nodes spanning at most 2**_BLOCK_LEVEL pixels are drawn as blocks,
+# memoized per call (see `expand_raster`)
+_BLOCK_LEVEL = 5
+# the cell bits of small nodes (k = 0, 1, 2) in Morton order
+_Z_ORDER = [np.zeros(1, dtype=np.int64), np.arange(4), np.array(_MORTON_BIT)]
+
+def expand_array(node, x=0, y=0, clip=None, level=0):
+    """
+    Same as `expand`, but walks the quadtree iteratively and returns
+    NumPy arrays `(xs, ys, grays)` (in the same order as `expand`).
+    `clip` is the rectangle (x1, x2, y1, y2) of cells (inclusive) to keep;
+    at `level > 0` the blocks overlapping it are kept.
+    The walk stops at the level-`level` nodes (or at the 4x4 cell masks),
+    whose records are unpacked all at once; the records of a subtree seen
+    before are copied from its first occurrence instead of walked again.
+    """
+    leaf_k = level if level > 0 else min(node.k, 2)
+    values, pxs, pys = [], [], []
+    # node -> (start, end, x, y) of its records, once complete
+    placed = {}
+    stack = [(node, x, y, None)]
+    while stack:
+        node, x, y, start = stack.pop()
+        if start is not None:
+            placed[node] = (start, len(values), x, y)
+            continue
+        if node.n == 0:
+            continue
+        size = 1 << node.k
+        inside = True
+        if clip is not None:
+            if x + size <= clip[0] or x > clip[1] or y + size <= clip[2] or y > clip[3]:
+                continue
+            inside = clip[0] <= x and x + size <= clip[1] + 1 and clip[2] <= y and y + size <= clip[3] + 1
+        if node.k == leaf_k:
+            values.append(node.n if level > 0 else node.cells)
+            pxs.append(x >> level)
+            pys.append(y >> level)
+        elif node in placed:
+            first, last, px, py = placed[node]
+            values.extend(values[first:last])
+            dx, dy = (x - px) >> level, (y - py) >> level
+            pxs.extend([v + dx for v in pxs[first:last]])
+            pys.extend([v + dy for v in pys[first:last]])
+        else:
+            if inside:
+                stack.append((node, x, y, len(values)))
+            half = size >> 1
+            stack.extend([
+                (node.d, x + half, y + half, None), (node.c, x, y + half, None),
+                (node.b, x + half, y, None), (node.a, x, y, None)
+            ])
+
+    xs = np.array(pxs, dtype=np.int64)
+    ys = np.array(pys, dtype=np.int64)
+    if level > 0:
+        grays = np.array(values, dtype=float) / 4 ** level
+    else:
+        values = np.array(values, dtype=np.int64)
+        # unpack the cell masks, bits in Morton order like `expand`
+        bits = _Z_ORDER[leaf_k]
+        rows, cols = np.nonzero((values[:, None] >> bits) & 1)
+        xs = xs[rows] + (bits[cols] & ((1 << leaf_k) - 1))
+        ys = ys[rows] + (bits[cols] >> leaf_k)
+        grays = np.ones(len(xs))
+    if clip is not None:
+        keep = (
+            (xs >= clip[0] >> level) & (xs <= clip[1] >> level)
+            & (ys >= clip[2] >> level) & (ys <= clip[3] >> level)
+        )
+        xs, ys, grays = xs[keep], ys[keep], grays[keep]
+    return xs, ys, grays
+
+def _block_raster(node, level, memo):
+    """The raster of gray levels of a small node, memoized in `memo`."""
+    got = memo.get(node)
+    if got is None:
+        if node.k == level:
+            got = np.full((1, 1), node.n / 4 ** level)
+        elif level == 0 and node.cells is not None:
+            bits = (node.cells >> np.arange(1 << 2 * node.k)) & 1
+            got = bits.reshape(1 << node.k, 1 << node.k).astype(float)
+        else:
+            half = 1 << (node.k - 1 - level)
+            got = np.zeros((2 * half, 2 * half))
+            for child, dx, dy in [
+                (node.a, 0, 0), (node.b, half, 0), (node.c, 0, half), (node.d, half, half)
+            ]:
+                if child.n > 0:
+                    got[dy:dy + half, dx:dx + half] = _block_raster(child, level, memo)
+        memo[node] = got
+    return got
+
+def _blit(raster, x, y, size, src=None, block=None):
+    """Copy a size x size square (either `block`, or the square of `raster`
+    at `src`) to (x, y) in `raster`, clipped to the bounds of `raster`."""
+    h, w = raster.shape
+    x1, y1 = max(x, 0), max(y, 0)
+    x2, y2 = min(x + size, w), min(y + size, h)
+    if block is None:
+        sx, sy = src
+        block = raster[sy:sy + size, sx:sx + size]
+    raster[y1:y2, x1:x2] = block[y1 - y:y2 - y, x1 - x:x2 - x]
+
+def expand_raster(node, clip=None, level=0, memo=None):
+    """
+    Turn a quadtree into a dense raster of gray levels
+    (`raster[y, x]` is the pixel (x, y) of `expand(node, level=level)`).
+    If `clip` (x1, x2, y1, y2) is given, the raster only covers the pixels
+    of the cells in that rectangle (inclusive), starting at (x1, y1).
+    The quadtree is walked iteratively, and a subtree seen before is
+    copied from where it was first drawn instead of being walked again.
+    The rasters of small nodes are memoized in `memo` (node -> raster
+    at this `level`), which can be kept across calls (see `render`).
+    """
+    size = 1 << max(node.k - level, 0)
+    if clip is None:
+        ox, oy, w, h = 0, 0, size, size
+    else:
+        ox, oy = clip[0] >> level, clip[2] >> level
+        w, h = (clip[1] >> level) - ox + 1, (clip[3] >> level) - oy + 1
+    raster = np.zeros((h, w))
+    memo = {} if memo is None else memo
+    # node -> position of a complete copy in the raster
+    placed = {}
+    stack = [(node, -ox, -oy, False)]
+    while stack:
+        node, x, y, done = stack.pop()
+        if done:
+            placed[node] = (x, y)
+            continue
+        size = 1 << (node.k - level)
+        if node.n == 0 or x >= w or y >= h or x + size <= 0 or y + size <= 0:
+            continue
+        if node in placed:
+            _blit(raster, x, y, size, src=placed[node])
+        elif node.k - level <= _BLOCK_LEVEL:
+            _blit(raster, x, y, size, block=_block_raster(node, level, memo))
+        else:
+            if x >= 0 and y >= 0 and x + size <= w and y + size <= h:
+                stack.append((node, x, y, True))
+            half = size >> 1
+            stack.extend([
+                (node.d, x + half, y + half, False), (node.c, x, y + half, False),
+                (node.b, x + half, y, False), (node.a, x, y, False)
+            ])
+    return raster
 #
 # DECONSTRUCTOR
 #####################
@@ -178,33 +485,119 @@ def pad(node):
         return node
 
 def life(a, b, c, d, E, f, g, h, i):
-    """The standard life rule, taking eight neighbours and a centre cell E.
+    """The current rule (see `set_rule`), taking eight neighbours and a centre cell E.
     Returns on if should be on, and off otherwise."""
     outer = sum([t.n for t in [a, b, c, d, f, g, h, i]])
-    return on if (E.n and outer == 2) or outer == 3 else off # GoL rule
+    survive, born = _rule
+    return on if outer in (survive if E.n else born) else off
+
+def life_4x4_table(rule=LIFE_RULE):
+    """
+    The `rule` ([[survive], [born]], the standard life rule by default)
+    applied to every 4x4 block:
+    entry `cells` (16-bit mask, bit `4 * y + x`) is the 4-bit mask
+    of the 2x2 central successor (bit `2 * y + x`).
+    """
+    survive, born = rule
+    masks = np.arange(1 << 16)
+    # block[m, y, x]
+    block = ((masks[:, None] >> np.arange(16)) & 1).reshape(-1, 4, 4)
+    table = np.zeros(1 << 16, dtype=int)
+    for bit, (x, y) in enumerate([(1, 1), (2, 1), (1, 2), (2, 2)]):
+        E = block[:, y, x]
+        outer = block[:, y - 1 : y + 2, x - 1 : x + 2].sum(axis=(1, 2)) - E
+        table |= np.where(E == 1, np.isin(outer, survive), np.isin(outer, born)) << bit
+    return table.tolist()
+
+_LIFE_4x4 = life_4x4_table()
+
+def from_cells(cells, k):
+    """Return the (interned) node at level `k` <= 2 with the given cell mask."""
+    node = _small_nodes[k - 1][cells]
+    if node is None:
+        if k == 1:
+            node = join(*[on if cells >> i & 1 else off for i in range(4)])
+        else:
+            quads = [cells >> shift for shift in [0, 2, 8, 10]]
+            node = join(*[from_cells((q & 3) | (q >> 2 & 12), 1) for q in quads])
+    return node
 
 def life_4x4(m):
     """
     Return the next generation of a $k=2$ (i.e. 4x4) cell.
     To terminate the recursion, at the base level,
     if we have a $k=2$ 4x4 block,
-    we can compute the 2x2 central successor by iterating over all
-    the 3x3 sub-neighbourhoods of 1x1 cells using the standard Life rule.
+    the 2x2 central successor is looked up from its cells
+    (see `life_4x4_table`).
     """
-    na = life(m.a.a, m.a.b, m.b.a, m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a)  # AD
-    nb = life(m.a.b, m.b.a, m.b.b, m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b)  # BC
-    nc = life(m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a, m.c.c, m.c.d, m.d.c)  # CB
-    nd = life(m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b, m.c.d, m.d.c, m.d.d)  # DA
-    return join(na, nb, nc, nd)
+    return from_cells(_LIFE_4x4[m.cells], 1)
+
+def _window(cells, x, y):
+    """The 16-bit mask of the 4x4 block at (x, y) of an 8x8 mask."""
+    cells >>= 8 * y + x
+    return (
+        (cells & 15)
+        | (cells >> 4 & 0xF0)
+        | (cells >> 8 & 0xF00)
+        | (cells >> 12 & 0xF000)
+    )
+
+def _step_8x8(cells):
+    """One generation of the 4x4 centre of an 8x8 mask (16-bit mask)."""
+    return (
+        _spread[_LIFE_4x4[_window(cells, 1, 1)]]
+        | _spread[_LIFE_4x4[_window(cells, 3, 1)]] << 2
+        | _spread[_LIFE_4x4[_window(cells, 1, 3)]] << 8
+        | _spread[_LIFE_4x4[_window(cells, 3, 3)]] << 10
+    )
+
+def life_8x8(m, j, board=None):
+    """
+    Return the 4x4 central successor of a $k=3$ (i.e. 8x8) cell,
+    2**j generations in the future (j <= 1), using `_LIFE_4x4` on
+    bit masks only (no intermediate nodes).
+    If `board` (64-bit mask) is given, the cells outside of it are kept
+    off at every generation (see `bounded_successor`).
+    """
+    rows = [
+        (q.cells & 15) | (q.cells & 0xF0) << 4 | (q.cells & 0xF00) << 8 | (q.cells & 0xF000) << 12
+        for q in [m.a, m.b, m.c, m.d]
+    ]
+    cells = rows[0] | rows[1] << 4 | rows[2] << 32 | rows[3] << 36
+    if j == 1:
+        # first generation of the 6x6 centre, from nine 4x4 blocks
+        gen1 = 0
+        for y in [0, 2, 4]:
+            for x in [0, 2, 4]:
+                r = _LIFE_4x4[_window(cells, x, y)]
+                gen1 |= ((r & 3) | (r & 12) << 6) << (8 * y + x + 9)
+        cells = gen1 if board is None else gen1 & board
+    if board is None:
+        return from_cells(_step_8x8(cells), 2)
+    return from_cells(_step_8x8(cells) & _window(board, 2, 2), 2)
 
-@lru_cache(maxsize=2 ** 24)
 def join(a, b, c, d):
     """
     Combine four children at level `k-1` to a new node at level `k`.
-    If this is cached, return the cached node.
-    Otherwise, create a new node, and add it to the cache.
+    If this is in the node table, return the table node.
+    Otherwise, create a new node, and add it to the table.
     """
-    n = a.n + b.n + c.n + d.n
+    cells = None
+    if a.k < 2:
+        # small nodes are interned by their cells
+        if a.k == 0:
+            cells = a.cells | b.cells << 1 | c.cells << 2 | d.cells << 3
+        else:
+            cells = (
+                _spread[a.cells]
+                | _spread[b.cells] << 2
+                | _spread[c.cells] << 8
+                | _spread[d.cells] << 10
+            )
+        node = _small_nodes[a.k][cells]
+        if node is not None:
+            _join_stats["hits"] += 1
+            return node
     nhash = (
         a.k
         + 2
@@ -213,9 +606,72 @@ def join(a, b, c, d):
         + 8973110871315 * c.hash
         + 4318490180473 * d.hash
     ) & mask
-    return Node(a.k+1, n, nhash, a, b, c, d)
+    # the sum alone is symmetric (e.g., `a.b` and `b.a` get the same weight)
+    nhash = ((nhash ^ (nhash >> 29)) * 0xBF58476D1CE4E5B9) & mask
+    node = _nodes.get(nhash)
+    if node is not None:
+        if node.a is a and node.b is b and node.c is c and node.d is d:
+            _join_stats["hits"] += 1
+            return node
+        return _join_clash(nhash, a, b, c, d, cells)
+    _join_stats["misses"] += 1
+    node = Node(a.k + 1, a.n + b.n + c.n + d.n, nhash, a, b, c, d, cells)
+    _nodes[nhash] = node
+    if cells is not None:
+        _small_nodes[a.k][cells] = node
+    return node
+
+def _join_clash(nhash, a, b, c, d, cells):
+    """
+    `join` when the table node with this hash has other children:
+    either they are copies of the same pattern (a duplicate, we return the
+    table node so it stays canonical) or this is a genuine hash collision.
+    """
+    chain = _collisions.setdefault(nhash, [])
+    candidates = [_nodes[nhash]] + chain
+    for node in candidates:
+        if node.a is a and node.b is b and node.c is c and node.d is d:
+            _join_stats["hits"] += 1
+            return node
+    new = Node(a.k + 1, a.n + b.n + c.n + d.n, nhash, a, b, c, d, cells)
+    for node in candidates:
+        if same_structure(node, new):
+            _join_stats["duplicates"] += 1
+            return node
+    _join_stats["misses"] += 1
+    chain.append(new)
+    if cells is not None:
+        _small_nodes[a.k][cells] = new
+    return new
+
+def same_structure(p, q):
+    """True if two nodes hold the same pattern (even if not identical)."""
+    if p is q:
+        return True
+    if p.k != q.k or p.n != q.n or p.hash != q.hash:
+        return False
+    if p.k == 0:
+        return True
+    return (
+        same_structure(p.a, q.a)
+        and same_structure(p.b, q.b)
+        and same_structure(p.c, q.c)
+        and same_structure(p.d, q.d)
+    )
+
+def join_info():
+    """
+    Statistics of the node table, like `lru_cache.cache_info`.
+    `duplicates` counts the joins of children that were copies of
+    table nodes (the table node was returned, but it signals that some
+    node was built outside of `join`).
+    """
+    currsize = len(_nodes) + sum(len(chain) for chain in _collisions.values())
+    return JoinInfo(
+        _join_stats["hits"], _join_stats["misses"],
+        currsize, _join_stats["duplicates"]
+    )
 
-@lru_cache(maxsize=2 ** 24)
 def successor(m, j=None):
     """
     Return the 2**k-1 x 2**k-1 successor, 2**j generations in the future,
@@ -223,12 +679,33 @@ def successor(m, j=None):
     Therefore for a 8x8 (k=3) successor (k=2), up to 1 generation in the future
         (TODO: to confirm)
     """
+    j = m.k - 2 if j is None else min(j, m.k - 2)
+    table = _successors[j]
+    s = table.get(m)
+    if s is not None:
+        _successor_stats["hits"] += 1
+        if _levels is not None:
+            _levels[m.k][0] += 1
+        return s
+    _successor_stats["misses"] += 1
+    if _levels is not None:
+        return _timed_successor(m, j, table)
+    return _new_successor(m, j, table)
+
+def _new_successor(m, j, table):
+    """Compute (or load from the store) a successor missing from `table`."""
+    if _store is not None and m.n > 0:
+        s = _store.successor(m, j)
+        if s is not None:
+            table[m] = s
+            return s
     if m.n == 0:  # empty
-        return m.a
+        s = m.a
     elif m.k == 2:  # base case
         s = life_4x4(m)
+    elif m.k == 3:  # base case (up to two generations)
+        s = life_8x8(m, j)
     else:
-        j = m.k - 2 if j is None else min(j, m.k - 2)
         c1 = successor(join(m.a.a, m.a.b, m.a.c, m.a.d), j)
         c2 = successor(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
         c3 = successor(join(m.b.a, m.b.b, m.b.c, m.b.d), j)
@@ -253,12 +730,651 @@ def successor(m, j=None):
                 successor(join(c4, c5, c7, c8), j),
                 successor(join(c5, c6, c8, c9), j),
             )
+    table[m] = s
     return s
+
+def successor_info():
+    """Statistics of the successor tables, like `lru_cache.cache_info`."""
+    return SuccessorInfo(
+        _successor_stats["hits"], _successor_stats["misses"],
+        sum(len(table) for table in _successors.values())
+    )
+
+def successor_tables():
+    """Number of entries of the successor table of each step size `j`."""
+    return {j: len(table) for j, table in sorted(_successors.items())}
+
+def successor_items():
+    """Yield every cached `(node, j, successor node)`."""
+    for j, table in list(_successors.items()):
+        for m, s in list(table.items()):
+            yield m, j, s
+
+def cached_successor(m, j=None):
+    """The cached successor of `m` (2**j generations), or None."""
+    j = m.k - 2 if j is None else min(j, m.k - 2)
+    return _successors[j].get(m)
+
+def cache_successor(m, j, s):
+    """Add the successor `s` of `m` (2**j generations), computed elsewhere
+    (e.g., in another process), to the tables."""
+    j = m.k - 2 if j is None else min(j, m.k - 2)
+    _successors[j][m] = s
+
+def use_store(store):
+    """
+    Look up successor misses in `store` (e.g., a `diskstore.DiskStore`,
+    anything with a `successor(node, j)` method returning a node or None)
+    before computing them. None turns it off. Returns the previous store.
+    The store belongs to the current rule (see `set_rule`): a store with
+    a `rule` (B/S string) of its own must have the current one.
+    """
+    global _store
+    rule = getattr(store, "rule", None)
+    if rule is not None and parse_rule(rule) != _rule:
+        raise ValueError(f"store of rule {rule}, but the current rule is {rule_string(_rule)}")
+    previous, _store = _store, store
+    return previous
+
+def clear_successors(j=None):
+    """Drop the successor table of step size `j` (all tables if None)."""
+    if j is None:
+        _successors.clear()
+    else:
+        _successors.pop(j, None)
 #
 # STATIC OPERATIONS
 #####################
 
 
+#####################
+# GARBAGE COLLECTION
+#
+# Nodes (and their successors) are only dropped by `collect`, which keeps
+# whatever is reachable from the registered roots (see `register_root`)
+# and the nodes passed to it.
+# It runs automatically in `advance` and `ffwd` (between successor steps)
+# once the tables are estimated above `set_max_memory` megabytes.
+
+# rough footprint of a table entry (Node, its hash and population ints
+# and dict slot; dict slot for a successor)
+NODE_BYTES = 250
+SUCCESSOR_BYTES = 50
+
+_roots = Counter()
+_max_memory = None # bytes (None: never collect automatically)
+_gc_stats = {"collections": 0, "nodes": 0, "successors": 0}
+
+GCInfo = namedtuple("GCInfo", ["nodes", "successors"])
+
+# other tables keyed by nodes (e.g., rendered tiles), pruned by `collect`
+_node_caches = []
+
+def register_cache(cache):
+    """
+    Have `collect` drop the entries of `cache` (a dict whose keys and
+    values are nodes, tuples holding nodes, or anything else) that hold
+    a node dropped from the node table. Returns `cache`.
+    """
+    _node_caches.append(cache)
+    return cache
+
+def register_root(node):
+    """Keep `node` (and everything below it) alive across collections."""
+    _roots[node] += 1
+
+def unregister_root(node):
+    """Undo one `register_root` call."""
+    _roots[node] -= 1
+    if _roots[node] <= 0:
+        del _roots[node]
+
+def set_max_memory(megabytes):
+    """
+    Collect garbage when the node and successor tables are estimated
+    to take more than `megabytes` (like Golly's --maxmemory).
+    None disables automatic collection.
+    """
+    global _max_memory
+    _max_memory = None if megabytes is None else megabytes * 2 ** 20
+
+def _all_successors():
+    """The successor tables of every rule (the current one first)."""
+    return [_successors] + [state[0] for state in _other_rules.values()]
+
+def _successor_count():
+    return sum(len(table) for tables in _all_successors() for table in tables.values())
+
+def memory_usage():
+    """Estimated bytes held by the node and successor tables (of every rule)."""
+    return join_info().currsize * NODE_BYTES + _successor_count() * SUCCESSOR_BYTES
+
+def collect(*live):
+    """
+    Mark-and-sweep collection of the node and successor tables.
+    Marks every node reachable from the registered roots and from `live`,
+    following children and cached successors of marked nodes
+    (so warm results survive), then drops all the other nodes and
+    the successors of dropped nodes.
+    Empty nodes (kept by `get_zero`) and small nodes (interned
+    by their cells) are never dropped.
+    The successor tables of every rule are collected (see `set_rule`).
+    Returns GCInfo with the number of nodes and successors reclaimed.
+    """
+    results = {}
+    for tables in _all_successors():
+        for table in tables.values():
+            for m, s in table.items():
+                results.setdefault(id(m), []).append(s)
+
+    # mark (ids are safe: every node looked at is alive in the tables)
+    marked = set()
+    stack = list(_roots) + list(live)
+    while stack:
+        node = stack.pop()
+        if node.k == 0 or id(node) in marked:
+            continue
+        marked.add(id(node))
+        stack.extend([node.a, node.b, node.c, node.d])
+        stack.extend(results.get(id(node), []))
+    del results
+
+    # sweep
+    def keep(node):
+        return id(node) in marked or node.n == 0 or node.k <= 2
+
+    nodes_before = join_info().currsize
+    chains = {}
+    for nhash, chain in _collisions.items():
+        chain = [node for node in [_nodes[nhash]] + chain if keep(node)]
+        if chain:
+            chains[nhash] = chain
+    kept = {nhash: node for nhash, node in _nodes.items() if keep(node)}
+    _nodes.clear()
+    _nodes.update(kept)
+    _collisions.clear()
+    for nhash, chain in chains.items():
+        _nodes[nhash] = chain[0]
+        if len(chain) > 1:
+            _collisions[nhash] = chain[1:]
+    del kept, chains
+
+    successors_before = _successor_count()
+    if _levels is not None:
+        for j, table in _successors.items():
+            _evicted.update((m.hash, j) for m in table if id(m) not in marked)
+    for tables in _all_successors():
+        for j, table in list(tables.items()):
+            tables[j] = {m: s for m, s in table.items() if id(m) in marked}
+    def alive(item):
+        if isinstance(item, Node):
+            return keep(item)
+        if isinstance(item, tuple):
+            return all(alive(v) for v in item)
+        return True
+
+    for cache in _node_caches:
+        kept = {m: v for m, v in cache.items() if alive(m) and alive(v)}
+        cache.clear()
+        cache.update(kept)
+
+    info = GCInfo(
+        nodes_before - join_info().currsize,
+        successors_before - _successor_count()
+    )
+    _gc_stats["collections"] += 1
+    _gc_stats["nodes"] += info.nodes
+    _gc_stats["successors"] += info.successors
+    return info
+
+def maybe_collect(*live):
+    """Run `collect` if the tables are above the memory budget."""
+    if _max_memory is not None and memory_usage() > _max_memory:
+        return collect(*live)
+    return None
+
+def gc_info():
+    """Number of collections and totals reclaimed so far."""
+    return dict(_gc_stats)
+#
+# GARBAGE COLLECTION
+#####################
+
+
+#####################
+# INSTRUMENTATION
+#
+# Per-level view of the tables, to size `set_max_memory` and spot the
+# patterns that defeat the caches (e.g., many misses or recomputations
+# at the top levels). Counting is off by default: it costs a test per
+# successor hit, and two clock reads per miss.
+LevelInfo = namedtuple(
+    "LevelInfo", ["nodes", "successors", "hits", "misses", "recomputed", "seconds", "bytes"]
+)
+
+def instrument(enabled=True):
+    """Start counting (from zero) successor hits, misses, recomputations
+    and time per level, or stop if not `enabled`."""
+    global _levels
+    _levels = defaultdict(lambda: [0, 0, 0, 0.0]) if enabled else None
+    _evicted.clear()
+
+def _timed_successor(m, j, table):
+    counters = _levels[m.k]
+    counters[1] += 1
+    if _evicted and (m.hash, j) in _evicted:
+        counters[2] += 1
+    start = time.perf_counter()
+    s = _new_successor(m, j, table)
+    now = time.perf_counter()
+    counters[3] += now - start
+    if _monitor is not None and now >= _monitor[2]:
+        _monitor[2] = now + _monitor[1]
+        _monitor[0](level_info())
+    return s
+
+def level_info():
+    """
+    A snapshot of the tables, per level: {k: LevelInfo}, with
+    * `nodes`, `successors`: the entries of the node and successor tables
+    * `hits`, `misses`: successor lookups since `instrument` (0 if off)
+    * `recomputed`: misses on successors that `collect` had dropped
+    * `seconds`: time spent computing missing successors (including the
+      successors of the levels below that they needed)
+    * `bytes`: estimated footprint of the entries (see `NODE_BYTES`)
+    """
+    nodes, successors = Counter(), Counter()
+    for node in _nodes.values():
+        nodes[node.k] += 1
+    for chain in _collisions.values():
+        for node in chain:
+            nodes[node.k] += 1
+    for table in _successors.values():
+        for m in table:
+            successors[m.k] += 1
+    levels = {} if _levels is None else _levels
+    return {
+        k: LevelInfo(
+            nodes[k], successors[k], *levels.get(k, [0, 0, 0, 0.0]),
+            nodes[k] * NODE_BYTES + successors[k] * SUCCESSOR_BYTES
+        )
+        for k in sorted(set(nodes) | set(successors) | set(levels))
+    }
+
+def set_monitor(callback, seconds=1.0):
+    """
+    Call `callback(level_info())` at most every `seconds` while successors
+    are being computed (e.g., during a long `advance` or `ffwd`), turning
+    `instrument` on if needed. None stops the calls.
+    The callback runs in the middle of the recursion: it must not change
+    the tables (no `collect`).
+    """
+    global _monitor
+    if callback is None:
+        _monitor = None
+        return
+    if _levels is None:
+        instrument()
+    _monitor = [callback, seconds, time.perf_counter() + seconds]
+#
+# INSTRUMENTATION
+#####################
+
+
+#####################
+# RULES
+#
+# Life-like rules, as `[[survive], [born]]` numbers of on neighbours
+# (the `rule` of `Automata`), e.g. HighLife is [[2, 3], [3, 6]].
+# Nodes are only patterns: the node table is shared by all the rules.
+# The successor tables, the store (see `use_store`) and the bounded
+# successors belong to the current rule; those of the other rules are
+# set aside (and still collected) until `set_rule` switches back to them.
+def rule_key(rule):
+    """The canonical form of `rule`: ((survive, ...), (born, ...)), sorted."""
+    survive, born = rule
+    key = (tuple(sorted(set(survive))), tuple(sorted(set(born))))
+    assert all(0 <= n <= 8 for n in key[0] + key[1]), "neighbour counts are 0 to 8"
+    # (empty nodes must stay empty)
+    assert 0 not in key[1], "B0 rules are not supported"
+    return key
+
+def parse_rule(text):
+    """The rule of a B/S string (e.g., "B36/S23" for HighLife)."""
+    parts = dict((part[:1].upper(), part[1:]) for part in text.strip().split("/"))
+    assert set(parts) == {"B", "S"}, f"not a B/S rule: {text}"
+    return rule_key([[int(n) for n in parts["S"]], [int(n) for n in parts["B"]]])
+
+def rule_string(rule):
+    """The B/S string of `rule` (e.g., "B3/S23")."""
+    survive, born = rule_key(rule)
+    return "B" + "".join(map(str, born)) + "/S" + "".join(map(str, survive))
+
+def get_rule():
+    """The current rule, ((survive, ...), (born, ...))."""
+    return _rule
+
+def set_rule(rule):
+    """
+    Make `rule` ([[survive], [born]], or a B/S string) the rule of
+    `successor` (so of `advance`, `ffwd`, ...), with its own successor
+    tables (kept warm when switching back and forth). Returns the
+    previous rule.
+    """
+    global _rule, _successors, _LIFE_4x4, _store, _bounded_successors
+    key = parse_rule(rule) if isinstance(rule, str) else rule_key(rule)
+    previous = _rule
+    if key != _rule:
+        _other_rules[_rule] = (_successors, _LIFE_4x4, _store, _bounded_successors)
+        state = _other_rules.pop(key, None)
+        if state is None:
+            state = (defaultdict(dict), life_4x4_table(key), None, register_cache({}))
+        _successors, _LIFE_4x4, _store, _bounded_successors = state
+        _rule = key
+    return previous
+#
+# RULES
+#####################
+
+
+#####################
+# GEOMETRY
+#
+# node -> bounding box of its on cells (see `bounding_box`)
+_bboxes = register_cache({})
+
+def bounding_box(node):
+    """
+    The smallest rectangle (x1, x2, y1, y2) (inclusive, relative to the
+    top-left corner of `node`) holding all the on cells, None if empty.
+    Memoized per node, so the box of a new root only looks at its new nodes.
+    """
+    if node.n == 0:
+        return None
+    if node.k == 0:
+        return (0, 0, 0, 0)
+    box = _bboxes.get(node)
+    if box is None:
+        half = 1 << (node.k - 1)
+        boxes = [
+            (x1 + dx, x2 + dx, y1 + dy, y2 + dy)
+            for child, dx, dy in [
+                (node.a, 0, 0), (node.b, half, 0), (node.c, 0, half), (node.d, half, half)
+            ]
+            if child.n > 0
+            for x1, x2, y1, y2 in [bounding_box(child)]
+        ]
+        box = _bboxes[node] = (
+            min(b[0] for b in boxes), max(b[1] for b in boxes),
+            min(b[2] for b in boxes), max(b[3] for b in boxes),
+        )
+    return box
+
+def population_in(node, rect, x=0, y=0):
+    """
+    The number of on cells of `node` (with its top-left corner at (x, y))
+    in the rectangle `rect` (x1, x2, y1, y2), inclusive.
+    Only the children partially covered by `rect` are visited.
+    """
+    x1, x2, y1, y2 = rect
+    total = 0
+    stack = [(node, x, y)]
+    while stack:
+        node, x, y = stack.pop()
+        if node.n == 0:
+            continue
+        bx1, bx2, by1, by2 = bounding_box(node)
+        bx1, bx2, by1, by2 = bx1 + x, bx2 + x, by1 + y, by2 + y
+        if bx2 < x1 or bx1 > x2 or by2 < y1 or by1 > y2:
+            continue
+        if x1 <= bx1 and bx2 <= x2 and y1 <= by1 and by2 <= y2:
+            total += node.n
+            continue
+        half = 1 << (node.k - 1)
+        stack.extend([
+            (node.a, x, y), (node.b, x + half, y),
+            (node.c, x, y + half), (node.d, x + half, y + half)
+        ])
+    return total
+
+# (node, x, y) -> the node shifted by (x, y) (see `_shift`)
+_shifts = register_cache({})
+
+def _shift(m, x, y):
+    """
+    The level `k - 1` node with its top-left corner at (x, y) of the
+    level-k node `m` (0 <= x, y <= 2**(k-1)), memoized: for the same
+    offsets, repeated subtrees are only shifted once.
+    """
+    half = 1 << (m.k - 1)
+    if x & (half - 1) == 0 and y & (half - 1) == 0:
+        return [m.a, m.b, m.c, m.d][2 * (y >> (m.k - 1)) + (x >> (m.k - 1))]
+    if m.k == 2:
+        cells = m.cells >> (4 * y + x)
+        return from_cells((cells & 3) | (cells >> 2 & 12), 1)
+    key = (m, x, y)
+    got = _shifts.get(key)
+    if got is None:
+        # the 4x4 grid of grandchildren, and the 2x2 blocks of it
+        # holding each quadrant of the result
+        grid = [
+            [m.a.a, m.a.b, m.b.a, m.b.b], [m.a.c, m.a.d, m.b.c, m.b.d],
+            [m.c.a, m.c.b, m.d.a, m.d.b], [m.c.c, m.c.d, m.d.c, m.d.d],
+        ]
+        quarter = half >> 1
+        quads = []
+        for qy, qx in [(y, x), (y, x + quarter), (y + quarter, x), (y + quarter, x + quarter)]:
+            i, j = qy // quarter, qx // quarter
+            block = join(grid[i][j], grid[i][j + 1], grid[i + 1][j], grid[i + 1][j + 1])
+            quads.append(_shift(block, qx - j * quarter, qy - i * quarter))
+        got = _shifts[key] = join(*quads)
+    return got
+
+def _block(node, i, j, k):
+    """The aligned level-k block (i, j) of `node` (empty outside of it)."""
+    blocks = 1 << (node.k - k)
+    if not (0 <= i < blocks and 0 <= j < blocks):
+        return get_zero(k)
+    while node.k > k:
+        blocks >>= 1
+        node = [node.a, node.b, node.c, node.d][2 * (j >= blocks) + (i >= blocks)]
+        i, j = i % blocks, j % blocks
+    return node
+
+def window(node, x, y, k):
+    """
+    The level-k node with its top-left corner at (x, y) of `node`
+    (cells outside of `node` are off).
+    Windows of identical content at the same offset (modulo 2**k) give
+    the same node, whatever their alignment in `node`.
+    """
+    ix, iy = x >> k, y >> k
+    m = join(
+        _block(node, ix, iy, k), _block(node, ix + 1, iy, k),
+        _block(node, ix, iy + 1, k), _block(node, ix + 1, iy + 1, k)
+    )
+    return _shift(m, x - (ix << k), y - (iy << k))
+#
+# GEOMETRY
+#####################
+
+
+#####################
+# EDITING
+#
+# Edits return a new root: only the nodes on the path to the edited
+# cells are rebuilt (through `join`), every other subtree is shared
+# with the original node (which is left unchanged).
+# Coordinates are relative to the top-left corner of the node.
+def get_cell(node, x, y):
+    """1 if the cell (x, y) of `node` is on, 0 otherwise."""
+    assert 0 <= x < 1 << node.k and 0 <= y < 1 << node.k, "cell outside of the node"
+    while node.k > 2:
+        if node.n == 0:
+            return 0
+        half = 1 << (node.k - 1)
+        node = [node.a, node.b, node.c, node.d][2 * (y >= half) + (x >= half)]
+        x, y = x & (half - 1), y & (half - 1)
+    return node.cells >> ((y << node.k) + x) & 1
+
+def set_cell(node, x, y, alive=True):
+    """A copy of `node` with the cell (x, y) on (off if not `alive`)."""
+    assert 0 <= x < 1 << node.k and 0 <= y < 1 << node.k, "cell outside of the node"
+    if node.k <= 2:
+        bit = 1 << ((y << node.k) + x)
+        cells = node.cells | bit if alive else node.cells & ~bit
+        if node.k == 0:
+            return on if cells else off
+        return from_cells(cells, node.k)
+    half = 1 << (node.k - 1)
+    quads = [node.a, node.b, node.c, node.d]
+    i = 2 * (y >= half) + (x >= half)
+    quads[i] = set_cell(quads[i], x & (half - 1), y & (half - 1), alive)
+    return join(*quads)
+
+def _edit(node, rect, fill, x=0, y=0):
+    """`node` (with its top-left corner at (x, y)) with the rectangle `rect`
+    (x1, x2, y1, y2) replaced: `fill(k, x, y)` gives the level-k blocks
+    at (x, y) inside of it."""
+    x1, x2, y1, y2 = rect
+    size = 1 << node.k
+    if x2 < x or y2 < y or x1 >= x + size or y1 >= y + size:
+        return node
+    if x1 <= x and y1 <= y and x2 >= x + size - 1 and y2 >= y + size - 1:
+        return fill(node.k, x, y)
+    half = size >> 1
+    return join(
+        _edit(node.a, rect, fill, x, y), _edit(node.b, rect, fill, x + half, y),
+        _edit(node.c, rect, fill, x, y + half), _edit(node.d, rect, fill, x + half, y + half)
+    )
+
+def clear_region(node, rect):
+    """A copy of `node` with the cells of the rectangle `rect`
+    (x1, x2, y1, y2), inclusive, all off."""
+    return _edit(node, rect, lambda k, x, y: get_zero(k))
+
+def paste(node, pattern, x, y):
+    """
+    A copy of `node` with the square of `pattern` (all its 2**k x 2**k
+    cells, off cells included) pasted with its top-left corner at (x, y).
+    Cells of `pattern` falling outside of `node` are dropped.
+    Aligned pastes (x, y multiples of the size of `pattern`) only rebuild
+    the path to the pasted square; others go through `window`.
+    """
+    size = 1 << pattern.k
+    return _edit(
+        node, (x, x + size - 1, y, y + size - 1),
+        lambda k, bx, by: window(pattern, bx - x, by - y, k)
+    )
+#
+# EDITING
+#####################
+
+
+#####################
+# SET ALGEBRA
+#
+# Cell-wise boolean operations between two nodes, with their top-left
+# corners aligned (the smaller node is grown with off cells).
+# Results are memoized per pair of nodes, and pairs of identical, empty
+# or full subtrees are settled without looking inside them: the cost
+# follows the difference between the operands, not their size.
+#
+# (op, p, q) -> the result of `op` on `p` and `q`
+_set_ops = register_cache({})
+
+_CELL_OPS = {
+    "xor": lambda p, q: p ^ q,
+    "and": lambda p, q: p & q,
+    "or": lambda p, q: p | q,
+    "difference": lambda p, q: p & ~q,
+}
+
+def _grow(node, k):
+    """`node` at the top-left corner of an otherwise empty level-k node."""
+    while node.k < k:
+        z = get_zero(node.k)
+        node = join(node, z, z, z)
+    return node
+
+def _settled(op, p, q):
+    """The result of `op` on `p` and `q` if it is known without
+    looking at their children, else None."""
+    full = 1 << 2 * p.k
+    if op == "xor":
+        if p is q:
+            return get_zero(p.k)
+        if p.n == 0:
+            return q
+        if q.n == 0:
+            return p
+    elif op == "and":
+        if p is q or p.n == 0 or q.n == full:
+            return p
+        if q.n == 0 or p.n == full:
+            return q
+    elif op == "or":
+        if p is q or q.n == 0 or p.n == full:
+            return p
+        if p.n == 0 or q.n == full:
+            return q
+    else:
+        if p.n == 0 or q.n == 0:
+            return p
+        if p is q or q.n == full:
+            return get_zero(p.k)
+    return None
+
+def _combine(op, p, q):
+    """The result of `op` on the same-level nodes `p` and `q`."""
+    got = _settled(op, p, q)
+    if got is not None:
+        return got
+    if p.k <= 2:
+        return from_cells(_CELL_OPS[op](p.cells, q.cells) & (1 << (1 << 2 * p.k)) - 1, p.k)
+    if op != "difference" and id(p) > id(q):
+        p, q = q, p
+    key = (op, p, q)
+    got = _set_ops.get(key)
+    if got is None:
+        got = _set_ops[key] = join(
+            _combine(op, p.a, q.a), _combine(op, p.b, q.b),
+            _combine(op, p.c, q.c), _combine(op, p.d, q.d)
+        )
+    return got
+
+def _binary(op, p, q):
+    k = max(p.k, q.k)
+    return _combine(op, _grow(p, k), _grow(q, k))
+
+def xor(p, q):
+    """The cells on in exactly one of `p` and `q` (empty iff they hold the same pattern)."""
+    return _binary("xor", p, q)
+
+def and_(p, q):
+    """The cells on in both `p` and `q`."""
+    return _binary("and", p, q)
+
+def or_(p, q):
+    """The cells on in `p` or `q`."""
+    return _binary("or", p, q)
+
+def difference(p, q):
+    """The cells on in `p` but not in `q`."""
+    return _binary("difference", p, q)
+
+def shift(node, dx, dy):
+    """
+    `node` with its cells moved by (dx, dy), at the same level
+    (cells moved outside of it are dropped). See `window`: shifts by the
+    same offsets reuse the shifted copies of repeated subtrees.
+    """
+    return window(node, -dx, -dy, node.k)
+#
+# SET ALGEBRA
+#####################
+
+
 #####################
 # TIME DYNAMICS
 #
@@ -279,18 +1395,134 @@ def advance(node, n):
         j = len(bits) - k - 1
         if bit:
             node = successor(node, j)
+            maybe_collect(node)
     return crop(node)
 
 def ffwd(node, n):
     """Advance as quickly as possible, taking n
     giant leaps"""
     gens = 0
+    # births with 1 or 2 neighbours spread at the speed of light (Life-like
+    # rules are otherwise limited to c/2): leap from one level further out
+    light_speed = bool({1, 2} & set(_rule[1]))
     for i in range(n):
         node = pad(node)
-        gens += 1 << (node.k - 2)
-        node = successor(node)
+        if light_speed:
+            node = centre(node)
+            gens += 1 << (node.k - 3)
+            node = successor(node, node.k - 3)
+        else:
+            gens += 1 << (node.k - 2)
+            node = successor(node)
+        maybe_collect(node)
     return node, gens
 
+def step(node, j, n=None):
+    """
+    Yield the successive roots of `node`, 2**j generations apart
+    (like the step size 2**j of Golly), `n` of them (forever if None).
+    Every step reuses the successor table of step size `j`
+    (see `successor_tables`), so several runs at the same step size
+    share one warm table.
+    """
+    i = 0
+    while n is None or i < n:
+        node = advance(node, 1 << j)
+        i += 1
+        yield node
+
+def advance_torus(node, n):
+    """
+    Advance the 2**k x 2**k torus `node` (the board itself, not padded:
+    see `construct_from_array(board, padded=False)`) by n generations.
+    Every step runs `successor` on a level k+1 node tiling the torus
+    (four copies of it, rolled by half a board), whose centre is the
+    torus itself; so a step is up to 2**(k-1) generations.
+    """
+    while n > 0:
+        j = min(n.bit_length() - 1, node.k - 1)
+        rolled = join(node.d, node.c, node.b, node.a)
+        node = successor(join(rolled, rolled, rolled, rolled), j)
+        n -= 1 << j
+    return node
+
+# (node, j, board rectangle) -> successor node (see `bounded_successor`)
+_bounded_successors = register_cache({})
+
+def bounded_successor(m, j, rect):
+    """
+    Like `successor`, but the cells outside of the rectangle `rect`
+    (x1, x2, y1, y2) (inclusive, relative to the top-left corner of `m`)
+    are dead at every generation.
+    Nodes inside the rectangle use `successor` (and its tables); only
+    the nodes across its border are computed here (memoized per rectangle,
+    clipped to the node, so nodes along a border share their results).
+    """
+    j = m.k - 2 if j is None else min(j, m.k - 2)
+    size = 1 << m.k
+    x1, x2, y1, y2 = max(rect[0], 0), min(rect[1], size - 1), max(rect[2], 0), min(rect[3], size - 1)
+    if (x1, x2, y1, y2) == (0, size - 1, 0, size - 1):
+        return successor(m, j)
+    if m.n == 0 or x1 > x2 or y1 > y2:
+        return get_zero(m.k - 1)
+    key = (m, j, (x1, x2, y1, y2))
+    s = _bounded_successors.get(key)
+    if s is not None:
+        return s
+    if m.k == 3:
+        row = ((1 << (x2 + 1)) - 1) ^ ((1 << x1) - 1)
+        board = sum(row << (8 * y) for y in range(y1, y2 + 1))
+        s = life_8x8(m, j, board)
+    else:
+        # the 3x3 overlapping sub-nodes, and their offsets
+        q = size >> 2
+        grid = [
+            [m.a.a, m.a.b, m.b.a, m.b.b], [m.a.c, m.a.d, m.b.c, m.b.d],
+            [m.c.a, m.c.b, m.d.a, m.d.b], [m.c.c, m.c.d, m.d.c, m.d.d],
+        ]
+
+        def sub(r, c, node, offset):
+            ox, oy = offset + c * q, offset + r * q
+            return bounded_successor(node, j, (x1 - ox, x2 - ox, y1 - oy, y2 - oy))
+
+        cs = [
+            [
+                sub(r, c, join(grid[r][c], grid[r][c + 1], grid[r + 1][c], grid[r + 1][c + 1]), 0)
+                for c in range(3)
+            ]
+            for r in range(3)
+        ]
+        if j < m.k - 2:
+            s = join(*[
+                join(cs[r][c].d, cs[r][c + 1].c, cs[r + 1][c].b, cs[r + 1][c + 1].a)
+                for r in range(2) for c in range(2)
+            ])
+        else:
+            s = join(*[
+                sub(r, c, join(cs[r][c], cs[r][c + 1], cs[r + 1][c], cs[r + 1][c + 1]), q >> 1)
+                for r in range(2) for c in range(2)
+            ])
+    _bounded_successors[key] = s
+    return s
+
+def advance_bounded(node, n, size=None):
+    """
+    Advance the finite board `node` (the board at the top-left corner of
+    a root that is not padded, see `construct_from_array(board, padded=False)`)
+    by n generations, the cells outside of the `size` x `size` board
+    (the whole root by default) being dead at all times.
+    Returns a node of the same level, with the board at the same place.
+    """
+    size = 1 << node.k if size is None else size
+    half = 1 << (node.k - 1)
+    while n > 0:
+        j = min(n.bit_length() - 1, node.k - 1)
+        # centred, the successor covers the same area
+        node = bounded_successor(centre(node), j, (half, half + size - 1, half, half + size - 1))
+        maybe_collect(node)
+        n -= 1 << j
+    return node
+
 def get_gen_for_giant_leaps(k, n):
     """Get the number of generation equivalent
     for n giant leaps for a given node of given k
@@ -310,6 +1542,35 @@ def get_gen_for_giant_leaps(k, n):
 #####################
 # RENDERING
 #
+# level -> {node: raster of the node at that level}, kept across calls
+_tiles = {}
+# cap on the number of cached rasters per level (32x32 pixels at most,
+# see `_BLOCK_LEVEL`)
+MAX_TILES = 4096
+
+class _Tiles(dict):
+    """A tile cache of at most `MAX_TILES` rasters: it is cleared when
+    full, even in the middle of a `render`."""
+
+    def __setitem__(self, node, raster):
+        if len(self) >= MAX_TILES:
+            self.clear()
+        super().__setitem__(node, raster)
+
+def render(node, level=0, viewport=None):
+    """
+    Rasterise `node` into a NumPy image of gray levels, zoomed out
+    by 2**level (see `expand_raster`), restricted to the `viewport`
+    (x1, x2, y1, y2) in cells (inclusive) if given.
+    The rasters of small nodes are memoized per node and level (up to
+    `MAX_TILES` per level), so rendering successive frames of a pattern
+    only draws the new nodes.
+    """
+    tiles = _tiles.get(level)
+    if tiles is None:
+        tiles = _tiles[level] = register_cache(_Tiles())
+    return expand_raster(node, clip=viewport, level=level, memo=tiles)
+
 def render_img(
         node,
         level=0,
@@ -320,27 +1581,22 @@ def render_img(
     """
     Utility to show a point collection as an image in Matplotlib
     """
-    pts = expand(node, level=level) # triplets with points and gray values (only > 0)
-    pts = np.array(pts)
-    pts[:, 0] -= np.min(pts[:, 0])
-    pts[:, 1] -= np.min(pts[:, 1])
+    if offset is not None:
+        assert crop==False, "offset only valid when crop is False"
+
+    # smallest box containing alive cells (the top-left on cell goes to (0, 0))
+    pixels = render(node, level, viewport=bounding_box(node))
+    rows, cols = np.nonzero(pixels)
+    pixels = pixels[rows.min():rows.max() + 1, cols.min():cols.max() + 1]
 
     if crop:
-        max_x = int(np.max(pts[:, 0] + 1))
-        max_y = int(np.max(pts[:, 1] + 1))
-        grays = np.zeros((max_y, max_x))
+        grays = pixels
     else:
         size = 2 ** node.k
         grays = np.zeros((size,size))
-
-    if offset is not None:
-        assert crop==False, "offset only valid when crop is False"
-        offset_y, offset_x = offset
-        for x, y, g in pts:
-            grays[int(y+offset_y), int(x+offset_x)] = g
-    else:
-        for x, y, g in pts:
-            grays[int(y), int(x)] = g
+        offset_y, offset_x = (0, 0) if offset is None else offset
+        offset_y, offset_x = int(offset_y), int(offset_x)
+        grays[offset_y:offset_y + pixels.shape[0], offset_x:offset_x + pixels.shape[1]] = pixels
 
     if filepath:
         fig = plt.figure()
@@ -0,0 +1,607 @@
+"""
+Array-backed hashlife.
+
+Same algorithm as `hashlife.py`, but a quadtree node is an integer ID
+into growable NumPy arrays (`a, b, c, d` children, `k` level, `n` population
+and `succ` giant-leap successor) instead of a Python `Node` object.
+Node IDs are canonical, so no hash is stored: hash-consing uses an
+open-addressing unique table of node IDs, keyed on the IDs of the children.
+The successor of a giant leap (`j = k - 2`, all of `ffwd`) is a column of
+the node, the other step sizes live in an open-addressing table keyed on
+`(node, j)`, so a cache lookup is a handful of integer reads and compares.
+Arrays and tables grow by 1.5x (tables are kept at most 2/3 full):
+a node takes about 40 bytes, an order of magnitude less than a `Node`
+and its cache entries.
+
+There are no nodes below level 3: a leaf is an 8x8 block packed in a
+64-bit mask (bit `8 * y + x`), stored in its `a` (low 32 bits) and `b`
+(high 32 bits) columns, and the base case of `successor` (a 16x16 node)
+runs the rule with bitwise operations on the four masks.
+
+Usage:
+
+    hl = ArrayHashLife()
+    node = hl.construct(pts)      # node is an int
+    node_30 = hl.advance(node, 30)
+    pts = hl.expand(node_30)
+    hl.n[node_30]                 # population (same as `node.n`)
+"""
+import numpy as np
+
+# level of the leaves (8x8 bitboards)
+LEAF_LEVEL = 3
+
+_M32 = (1 << 32) - 1
+_M64 = (1 << 64) - 1
+# multipliers of the children IDs in the key of a node (see `_join_key`)
+_P = (5131830419411, 3758991985019, 8973110871315, 4318490180473)
+
+# 4x4 quadrant at the top-left corner of a leaf
+_QUAD = 0x0F0F0F0F
+# a leaf with only the 2x2 corner next to its centre (see `is_padded`)
+_CORNER_A = 0xC0C0 << 48  # cells x, y = 6..7 (`a.d.d`)
+_CORNER_B = 0x0303 << 48  # x = 0..1, y = 6..7 (`b.c.c`)
+_CORNER_C = 0xC0C0  # x = 6..7, y = 0..1 (`c.b.b`)
+_CORNER_D = 0x0303  # x = 0..1, y = 0..1 (`d.a.a`)
+
+# 16x16 boards (for the base case) as 256-bit ints, bit `16 * y + x`
+_FULL_16 = (1 << 256) - 1
+_COL_0 = sum(1 << (16 * y) for y in range(16))
+_COL_15 = _COL_0 << 15
+
+# empty slot in the open-addressing tables
+_EMPTY = -1
+
+
+def _mix(h):
+    """Scramble a 64-bit key to get a table slot (low bits are used)."""
+    h ^= h >> 31
+    h = (h * 0x9E3779B97F4A7C15) & _M64
+    return h ^ (h >> 29)
+
+
+def _mix_np(h):
+    """Vectorised version of `_mix` (uint64 arithmetic wraps like `& _M64`)."""
+    h = h.astype(np.uint64)
+    h ^= h >> np.uint64(31)
+    h *= np.uint64(0x9E3779B97F4A7C15)
+    return h ^ (h >> np.uint64(29))
+
+
+def _join_key(a, b, c, d):
+    """The (scrambled) unique table key of the node with children `a, b, c, d`."""
+    return _mix((_P[0] * a + _P[1] * b + _P[2] * c + _P[3] * d) & _M64)
+
+
+def _signed(x):
+    """A 32-bit value as an int32 column entry."""
+    return x - (1 << 32) if x >> 31 else x
+
+
+def _grown(size):
+    """The next size of an array or table (1.5x)."""
+    return size + (size >> 1) + 1
+
+
+def _fill_table(keys, size):
+    """
+    Build an open-addressing (linear probing) table of `size` slots
+    holding the positions of `keys` (already scrambled), starting from
+    slot `key % size`.
+    All keys are inserted together, resolving collisions round by round.
+    """
+    table = np.full(size, _EMPTY, dtype=np.int32)
+    ids = np.arange(len(keys), dtype=np.int64)
+    slots = (keys % np.uint64(size)).astype(np.int64)
+    while ids.size:
+        # first pending key pointing at a free slot wins it
+        cand = np.flatnonzero(table[slots] == _EMPTY)
+        _, first = np.unique(slots[cand], return_index=True)
+        win = cand[first]
+        table[slots[win]] = ids[win]
+        keep = np.ones(ids.size, dtype=bool)
+        keep[win] = False
+        ids = ids[keep]
+        slots = (slots[keep] + 1) % size
+    return table
+
+
+def _leaf_quads(p, q, r, s):
+    """
+    The leaf made of the `d` quadrant of `p`, `c` of `q`, `b` of `r`
+    and `a` of `s` (all 64-bit leaf masks).
+    """
+    return (
+        (p >> 36 & _QUAD)
+        | (q >> 32 & _QUAD) << 4
+        | (r >> 4 & _QUAD) << 32
+        | (s & _QUAD) << 36
+    )
+
+
+def life_16x16(a, b, c, d, gens):
+    """
+    Run the standard life rule `gens` times on the 16x16 board made of
+    four leaves, and return the central 8x8 leaf.
+    Neighbours are counted for all cells at once with a bit-sliced
+    3-bit adder; counts go wrong from the border inwards by one cell per
+    generation, which never reaches the centre for `gens` <= 4.
+    """
+    board = 0
+    for leaf, shift in [(a, 0), (b, 8), (c, 128), (d, 136)]:
+        for y in range(8):
+            board |= (leaf >> (8 * y) & 0xFF) << (16 * y + shift)
+    for _ in range(gens):
+        west = (board << 1) & ~_COL_0
+        east = (board >> 1) & ~_COL_15
+        s0 = s1 = s2 = 0
+        for neighbour in [
+            west, east, board << 16, board >> 16,
+            west << 16, west >> 16, east << 16, east >> 16
+        ]:
+            carry0 = s0 & neighbour
+            s0 ^= neighbour
+            carry1 = s1 & carry0
+            s1 ^= carry0
+            s2 |= carry1
+        # 3 neighbours, or 2 and alive (GoL rule)
+        board = s1 & ~s2 & (s0 | board) & _FULL_16
+    leaf = 0
+    for y in range(8):
+        leaf |= (board >> (16 * (y + 4) + 4) & 0xFF) << (8 * y)
+    return leaf
+
+
+def _unpack_leaf(cells, x, y, clip, level):
+    """(x,y,gray) triples of a leaf at (x, y), for `level` < 3."""
+    size = 1 << level
+    counts = {}
+    while cells:
+        bit = cells & -cells
+        i = bit.bit_length() - 1
+        cells ^= bit
+        key = (x + (i & 7)) >> level, (y + (i >> 3)) >> level
+        counts[key] = counts.get(key, 0) + 1
+    pts = []
+    for (px, py), n in counts.items():
+        if clip is not None:
+            bx, by = px << level, py << level
+            if bx + size < clip[0] or bx > clip[1] or by + size < clip[2] or by > clip[3]:
+                continue
+        pts.append((px, py, n / (size ** 2)))
+    return pts
+
+
+class ArrayHashLife:
+    """
+    Hashlife engine with all nodes stored in NumPy arrays.
+    Node IDs are plain ints: leaves (k=3) are created by `leaf`,
+    every other node by `join`, and they never move.
+    The `c` and `d` children of a leaf are -1 (`a` and `b` hold its cells).
+    """
+
+    def __init__(self, capacity=1 << 10):
+        self.count = 0
+        self.a = np.zeros(capacity, dtype=np.int32)
+        self.b = np.zeros(capacity, dtype=np.int32)
+        self.c = np.zeros(capacity, dtype=np.int32)
+        self.d = np.zeros(capacity, dtype=np.int32)
+        self.k = np.zeros(capacity, dtype=np.uint8)
+        self.n = np.zeros(capacity, dtype=np.int64)
+        self.succ = np.full(capacity, _EMPTY, dtype=np.int32)
+        self._views()
+
+        # unique table (node ids) and successor table of the step sizes
+        # below giant leaps ((node, j) -> node)
+        self.unique = np.full(_grown(capacity), _EMPTY, dtype=np.int32)
+        self.succ_keys = np.full(16, _EMPTY, dtype=np.int64)
+        self.succ_vals = np.zeros(16, dtype=np.int32)
+        self.succ_count = 0
+        self._succ_table_count = 0
+        self._table_views()
+
+        # bookkeeping (same meaning as `lru_cache.cache_info`)
+        self.hits = self.misses = 0
+
+        self._zeros = [None] * LEAF_LEVEL + [self.leaf(0)]
+
+    #####################
+    # STORAGE
+    #
+    def _views(self):
+        # memoryviews index ~2x faster than arrays and return python ints
+        self._a = memoryview(self.a)
+        self._b = memoryview(self.b)
+        self._c = memoryview(self.c)
+        self._d = memoryview(self.d)
+        self._k = memoryview(self.k)
+        self._n = memoryview(self.n)
+        self._s = memoryview(self.succ)
+
+    def _table_views(self):
+        self._u = memoryview(self.unique)
+        self._usize = len(self.unique)
+        self._sk = memoryview(self.succ_keys)
+        self._sv = memoryview(self.succ_vals)
+        self._ssize = len(self.succ_keys)
+
+    def _grow_nodes(self):
+        # views held by callers stay valid for the nodes that already exist
+        capacity = _grown(len(self.k))
+        for name in ["a", "b", "c", "d", "k", "n", "succ"]:
+            old = getattr(self, name)
+            new = np.full(capacity, _EMPTY if name == "succ" else 0, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self._views()
+
+    def _add_node(self, k, n, a, b, c, d):
+        node = self.count
+        if node == len(self.k):
+            self._grow_nodes()
+        self._a[node], self._b[node], self._c[node], self._d[node] = a, b, c, d
+        self._k[node], self._n[node] = k, n
+        self.count += 1
+        return node
+
+    def _keys(self):
+        """The unique table keys of all the nodes (see `leaf` and `join`)."""
+        count = self.count
+        a, b, c, d = [arr[:count].astype(np.uint32).astype(np.uint64) for arr in [self.a, self.b, self.c, self.d]]
+        cells = a | b << np.uint64(32)
+        joins = np.uint64(_P[0]) * a + np.uint64(_P[1]) * b + np.uint64(_P[2]) * c + np.uint64(_P[3]) * d
+        return _mix_np(np.where(self.c[:count] == -1, cells, joins))
+
+    def _grow_unique(self):
+        # table positions are node ids
+        self.unique = _fill_table(self._keys(), _grown(len(self.unique)))
+        self._table_views()
+
+    def _grow_successors(self):
+        used = self.succ_keys != _EMPTY
+        keys, vals = self.succ_keys[used], self.succ_vals[used]
+        table = _fill_table(_mix_np(keys), _grown(len(self.succ_keys)))
+        self.succ_keys = np.full(len(table), _EMPTY, dtype=np.int64)
+        self.succ_vals = np.zeros(len(table), dtype=np.int32)
+        filled = table != _EMPTY
+        self.succ_keys[filled] = keys[table[filled]]
+        self.succ_vals[filled] = vals[table[filled]]
+        self._table_views()
+
+    def nbytes(self):
+        """Bytes held by the node arrays and both tables."""
+        arrays = [self.a, self.b, self.c, self.d, self.k, self.n, self.succ]
+        arrays += [self.unique, self.succ_keys, self.succ_vals]
+        return sum(arr.nbytes for arr in arrays)
+
+    def bytes_per_node(self):
+        return self.nbytes() / self.count
+
+    def cache_info(self):
+        """(hits, misses, nodes, successors) of the successor table."""
+        return self.hits, self.misses, self.count, self.succ_count
+    #
+    # STORAGE
+    #####################
+
+    #####################
+    # CONSTRUCTORS
+    #
+    def leaf(self, cells):
+        """Return the leaf (k=3) for an 8x8 block, given as a 64-bit mask."""
+        table, size = self._u, self._usize
+        A, B, C = self._a, self._b, self._c
+        lo, hi = _signed(cells & _M32), _signed(cells >> 32)
+        i = _mix(cells) % size
+        node = table[i]
+        while node != _EMPTY:
+            if C[node] == -1 and A[node] == lo and B[node] == hi:
+                return node
+            i = i + 1 if i + 1 < size else 0
+            node = table[i]
+        node = self._add_node(LEAF_LEVEL, cells.bit_count(), lo, hi, -1, -1)
+        table[i] = node
+        if 3 * self.count > 2 * size:
+            self._grow_unique()
+        return node
+
+    def cells(self, m):
+        """The 64-bit mask of the cells of the leaf `m`."""
+        return (self._a[m] & _M32) | (self._b[m] & _M32) << 32
+
+    def join(self, a, b, c, d):
+        """
+        Combine four children at level `k-1` to a new node at level `k`.
+        Return the existing node if these children were already joined.
+        """
+        A, B, C, D = self._a, self._b, self._c, self._d
+        table, size = self._u, self._usize
+        i = _join_key(a, b, c, d) % size
+        node = table[i]
+        while node != _EMPTY:
+            # (leaves never match: their `c` is -1)
+            if A[node] == a and B[node] == b and C[node] == c and D[node] == d:
+                return node
+            i = i + 1 if i + 1 < size else 0
+            node = table[i]
+        N = self._n
+        node = self._add_node(self._k[a] + 1, N[a] + N[b] + N[c] + N[d], a, b, c, d)
+        table[i] = node
+        if 3 * self.count > 2 * size:
+            self._grow_unique()
+        return node
+
+    def get_zero(self, k):
+        """Return an empty node at level `k` (>= 3)."""
+        assert k >= LEAF_LEVEL, f"no nodes below level {LEAF_LEVEL}"
+        while len(self._zeros) <= k:
+            z = self._zeros[-1]
+            self._zeros.append(self.join(z, z, z, z))
+        return self._zeros[k]
+
+    def construct(self, pts):
+        """
+        Turn a list of (x,y) coordinates into a quadtree
+        and return the top-level node id.
+        """
+        # Force start at (0,0)
+        min_x = min(x for x, y in pts)
+        min_y = min(y for x, y in pts)
+        # pack the cells into leaves
+        leaves = {}
+        for x, y in pts:
+            x, y = x - min_x, y - min_y
+            key = x >> 3, y >> 3
+            leaves[key] = leaves.get(key, 0) | 1 << (8 * (y & 7) + (x & 7))
+        pattern = {key: self.leaf(cells) for key, cells in leaves.items()}
+        k = LEAF_LEVEL
+        while len(pattern) != 1:
+            # bottom-up construction
+            next_level = {}
+            z = self.get_zero(k)
+            while len(pattern) > 0:
+                x, y = next(iter(pattern))
+                x, y = x - (x & 1), y - (y & 1)
+                a = pattern.pop((x, y), z)
+                b = pattern.pop((x + 1, y), z)
+                c = pattern.pop((x, y + 1), z)
+                d = pattern.pop((x + 1, y + 1), z)
+                next_level[x >> 1, y >> 1] = self.join(a, b, c, d)
+            pattern = next_level
+            k += 1
+        return self.pad(pattern.popitem()[1])
+    #
+    # CONSTRUCTORS
+    #####################
+
+    #####################
+    # DECONSTRUCTOR
+    #
+    def expand(self, node, x=0, y=0, clip=None, level=0):
+        """Turn a quadtree into a list of (x,y,gray) triples,
+        same as `hashlife.expand`."""
+        A, B, C, D, K, N = self._a, self._b, self._c, self._d, self._k, self._n
+        pts = []
+        stack = [(node, x, y)]
+        while stack:
+            node, x, y = stack.pop()
+            if N[node] == 0:
+                continue
+            size = 1 << K[node]
+            if clip is not None:
+                if x + size < clip[0] or x > clip[1] or y + size < clip[2] or y > clip[3]:
+                    continue
+            if K[node] == level:
+                pts.append((x >> level, y >> level, N[node] / (size ** 2)))
+            elif K[node] == LEAF_LEVEL:
+                pts.extend(_unpack_leaf(self.cells(node), x, y, clip, level))
+            else:
+                offset = size >> 1
+                # pushed in reverse so quadrants come out in `hashlife.expand` order
+                stack.append((D[node], x + offset, y + offset))
+                stack.append((C[node], x, y + offset))
+                stack.append((B[node], x + offset, y))
+                stack.append((A[node], x, y))
+        return pts
+    #
+    # DECONSTRUCTOR
+    #####################
+
+    #####################
+    # STATIC OPERATIONS
+    #
+    def centre(self, m):
+        """Return a node at level `k+1`, centered on the given node."""
+        if self._k[m] == LEAF_LEVEL:
+            cells, leaf = self.cells(m), self.leaf
+            return self.join(
+                leaf((cells & _QUAD) << 36),
+                leaf((cells >> 4 & _QUAD) << 32),
+                leaf((cells >> 32 & _QUAD) << 4),
+                leaf(cells >> 36 & _QUAD),
+            )
+        A, B, C, D = self._a, self._b, self._c, self._d
+        z = self.get_zero(self._k[m] - 1)
+        join = self.join
+        return join(
+            join(z, z, z, A[m]),
+            join(z, z, B[m], z),
+            join(z, C[m], z, z),
+            join(D[m], z, z, z),
+        )
+
+    def inner(self, m):
+        """Return the central portion of a node -- the inverse of centre()."""
+        A, B, C, D = self._a, self._b, self._c, self._d
+        if self._k[m] == LEAF_LEVEL + 1:
+            cells = self.cells
+            return self.leaf(_leaf_quads(cells(A[m]), cells(B[m]), cells(C[m]), cells(D[m])))
+        return self.join(D[A[m]], C[B[m]], B[C[m]], A[D[m]])
+
+    def is_padded(self, m):
+        """True if the pattern is surrounded by at least one sub-sub-block of
+        empty space."""
+        A, B, C, D, N = self._a, self._b, self._c, self._d, self._n
+        a, b, c, d = A[m], B[m], C[m], D[m]
+        if self._k[m] == LEAF_LEVEL + 1:
+            cells = self.cells
+            return not (
+                cells(a) & ~_CORNER_A
+                or cells(b) & ~_CORNER_B
+                or cells(c) & ~_CORNER_C
+                or cells(d) & ~_CORNER_D
+            )
+        return (
+            N[a] == N[D[D[a]]]
+            and N[b] == N[C[C[b]]]
+            and N[c] == N[B[B[c]]]
+            and N[d] == N[A[A[d]]]
+        )
+
+    def crop(self, m):
+        """Repeatedly take the inner node, until all padding is removed."""
+        while self._k[m] > 3 and self.is_padded(m):
+            m = self.inner(m)
+        return m
+
+    def pad(self, m):
+        """Repeatedly centre a node, until it is fully padded."""
+        while self._k[m] <= 3 or not self.is_padded(m):
+            m = self.centre(m)
+        return m
+
+    def successor(self, m, j=None):
+        """
+        Return the 2**k-1 x 2**k-1 successor, 2**j generations in the future,
+        where j <= k - 2, caching the result.
+        """
+        k = self._k[m]
+        j = k - 2 if j is None else min(j, k - 2)
+        if self._n[m] == 0:  # empty
+            return self._a[m]
+
+        # successor lookup: the node's column for giant leaps, else the table
+        giant = j == k - 2
+        if giant:
+            s = self._s[m]
+            if s != _EMPTY:
+                self.hits += 1
+                return s
+        else:
+            key = m * 64 + j
+            keys, size = self._sk, self._ssize
+            i = _mix(key) % size
+            while keys[i] != _EMPTY:
+                if keys[i] == key:
+                    self.hits += 1
+                    return self._sv[i]
+                i = i + 1 if i + 1 < size else 0
+        self.misses += 1
+
+        if k == LEAF_LEVEL + 1:  # base case, on bitboards
+            cells = self.cells
+            s = self.leaf(life_16x16(
+                cells(self._a[m]), cells(self._b[m]), cells(self._c[m]), cells(self._d[m]), 1 << j
+            ))
+        else:
+            A, B, C, D = self._a, self._b, self._c, self._d
+            join, successor = self.join, self.successor
+            a, b, c, d = A[m], B[m], C[m], D[m]
+            # (the corner grandchildren are only needed through a, b, c, d)
+            ab, ac, ad = B[a], C[a], D[a]
+            ba, bc, bd = A[b], C[b], D[b]
+            ca, cb, cd = A[c], B[c], D[c]
+            da, db, dc = A[d], B[d], C[d]
+            c1 = successor(a, j)
+            c2 = successor(join(ab, ba, ad, bc), j)
+            c3 = successor(b, j)
+            c4 = successor(join(ac, ad, ca, cb), j)
+            c5 = successor(join(ad, bc, cb, da), j)
+            c6 = successor(join(bc, bd, da, db), j)
+            c7 = successor(c, j)
+            c8 = successor(join(cb, da, cd, dc), j)
+            c9 = successor(d, j)
+
+            if j < k - 2 and k == LEAF_LEVEL + 2:
+                # the c's are leaves
+                cells, leaf = self.cells, self.leaf
+                c1, c2, c3, c4, c5, c6, c7, c8, c9 = [cells(c) for c in [c1, c2, c3, c4, c5, c6, c7, c8, c9]]
+                s = join(
+                    leaf(_leaf_quads(c1, c2, c4, c5)),
+                    leaf(_leaf_quads(c2, c3, c5, c6)),
+                    leaf(_leaf_quads(c4, c5, c7, c8)),
+                    leaf(_leaf_quads(c5, c6, c8, c9)),
+                )
+            elif j < k - 2:
+                # the c's may be newer than the views taken above
+                A, B, C, D = self._a, self._b, self._c, self._d
+                quads = [
+                    (D[c1], C[c2], B[c4], A[c5]),
+                    (D[c2], C[c3], B[c5], A[c6]),
+                    (D[c4], C[c5], B[c7], A[c8]),
+                    (D[c5], C[c6], B[c8], A[c9]),
+                ]
+                s = join(*[join(*quad) for quad in quads])
+            else:
+                s = join(
+                    successor(join(c1, c2, c4, c5), j),
+                    successor(join(c2, c3, c5, c6), j),
+                    successor(join(c4, c5, c7, c8), j),
+                    successor(join(c5, c6, c8, c9), j),
+                )
+
+        self.succ_count += 1
+        if giant:
+            # (through the current view: the recursion may have grown the arrays)
+            self._s[m] = s
+            return s
+        # the recursion may have grown the table: search the slot again
+        keys, size = self._sk, self._ssize
+        i = _mix(key) % size
+        while keys[i] != _EMPTY:
+            i = i + 1 if i + 1 < size else 0
+        keys[i] = key
+        self._sv[i] = s
+        self._succ_table_count += 1
+        if 3 * self._succ_table_count > 2 * size:
+            self._grow_successors()
+        return s
+    #
+    # STATIC OPERATIONS
+    #####################
+
+    #####################
+    # TIME DYNAMICS
+    #
+    def advance(self, node, n):
+        """Advance node by exactly n generations, using
+        the binary expansion of n to find the correct successors"""
+        if n == 0:
+            return node
+        bits = []
+        while n > 0:
+            bits.append(n & 1)
+            n = n >> 1
+            node = self.centre(node)
+        for k, bit in enumerate(reversed(bits)):
+            j = len(bits) - k - 1
+            if bit:
+                node = self.successor(node, j)
+        return self.crop(node)
+
+    def ffwd(self, node, n):
+        """Advance as quickly as possible, taking n giant leaps"""
+        gens = 0
+        for i in range(n):
+            node = self.pad(node)
+            gens += 1 << (self._k[node] - 2)
+            node = self.successor(node)
+        return node, gens
+    #
+    # TIME DYNAMICS
+    #####################
+
+    def describe(self, node):
+        """Same text as `Node.__repr__`."""
+        size = 1 << self._k[node]
+        return f"Node k={self._k[node]}, {size} x {size}, population {self._n[node]}"
@@ -0,0 +1,129 @@
+"""
+Read and write hashlife quadtrees in Golly's macrocell format (.mc).
+
+A macrocell file lists every distinct node of the quadtree once, children
+first, so its size follows the number of distinct nodes rather than the
+population. Nodes are numbered from 1 in the order of their lines:
+* an 8x8 leaf is a line of rows of `.` (off) and `*` (on) cells,
+  each row ending with `$` (trailing off cells may be omitted)
+* a larger node is a line `k a b c d`, with `k` its level (2**k cells
+  wide) and `a b c d` the numbers of its children (0 for an empty node)
+The last node is the root. Files ending with `.gz` are gzip-compressed
+(and gzip-compressed files are recognised when reading).
+
+Reading goes through `join`, so the nodes land directly in the node table
+(shared with the nodes already there).
+"""
+import gzip
+from gol.hl.hashlife import join, get_zero, centre, from_cells, get_rule, rule_string
+
+MC_HEADER = "[M2] (gol hashlife)"
+
+
+def _open(fname, mode):
+    if mode == "w":
+        if fname.endswith(".gz"):
+            return gzip.open(fname, "wt")
+        return open(fname, "w")
+    with open(fname, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    return gzip.open(fname, "rt") if compressed else open(fname)
+
+
+def leaf_line(node):
+    """The macrocell line of a level-3 node."""
+    rows = []
+    for y in range(8):
+        left, right = (node.a, node.b) if y < 4 else (node.c, node.d)
+        row = (left.cells >> 4 * (y & 3) & 15) | (right.cells >> 4 * (y & 3) & 15) << 4
+        rows.append("".join("*" if row >> x & 1 else "." for x in range(8)).rstrip(".") + "$")
+    return "".join(rows)
+
+
+def parse_leaf(line):
+    """The level-3 node of a macrocell leaf line."""
+    quads = [0, 0, 0, 0]
+    x, y = 0, 0
+    for ch in line:
+        if ch == "$":
+            x, y = 0, y + 1
+        elif ch in ".*":
+            if ch == "*":
+                quads[2 * (y >> 2) + (x >> 2)] |= 1 << (4 * (y & 3) + (x & 3))
+            x += 1
+    return join(*[from_cells(cells, 2) for cells in quads])
+
+
+def to_mc(node, generation=None, rule=None):
+    """
+    Yield the lines of the macrocell form of `node` (level >= 3; smaller
+    nodes are centred first), each distinct node once, children first.
+    `rule` is a B/S string (the current rule of `hashlife` if None).
+    """
+    while node.k < 3:
+        node = centre(node)
+    yield MC_HEADER
+    yield f"#R {rule_string(get_rule()) if rule is None else rule}"
+    if generation is not None:
+        yield f"#G {generation}"
+    numbers = {}
+    stack = [node]
+    while stack:
+        m = stack[-1]
+        if m in numbers:
+            stack.pop()
+            continue
+        if m.k == 3:
+            stack.pop()
+            numbers[m] = len(numbers) + 1
+            yield leaf_line(m)
+            continue
+        pending = [q for q in (m.d, m.c, m.b, m.a) if q.n > 0 and q not in numbers]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        numbers[m] = len(numbers) + 1
+        children = " ".join(str(numbers[q]) if q.n > 0 else "0" for q in (m.a, m.b, m.c, m.d))
+        yield f"{m.k} {children}"
+
+
+def write_mc(node, fname, generation=None, rule=None):
+    """Write `node` to the macrocell file `fname` (gzip if it ends with `.gz`)."""
+    with _open(fname, "w") as f:
+        for line in to_mc(node, generation, rule):
+            f.write(line + "\n")
+
+
+def from_mc(lines):
+    """
+    Build the quadtree of macrocell `lines`.
+    Returns the root and a dict of the `rule` and `generation` (if given).
+    """
+    nodes = [None]
+    info = {"rule": "B3/S23", "generation": None}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("[M2]"):
+            continue
+        if line.startswith("#"):
+            if line.startswith("#R"):
+                info["rule"] = line[2:].strip()
+            elif line.startswith("#G"):
+                info["generation"] = int(line[2:].strip())
+            continue
+        if line[0] in ".*$":
+            nodes.append(parse_leaf(line))
+            continue
+        k, *children = [int(v) for v in line.split()]
+        z = get_zero(k - 1)
+        nodes.append(join(*[nodes[i] if i > 0 else z for i in children]))
+    if len(nodes) == 1:
+        raise ValueError("no node in macrocell data")
+    return nodes[-1], info
+
+
+def read_mc(fname):
+    """Read the macrocell file `fname` (plain or gzip-compressed), see `from_mc`."""
+    with _open(fname, "r") as f:
+        return from_mc(f)
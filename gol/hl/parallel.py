@@ -0,0 +1,154 @@
+"""
+Process-parallel successors of large hashlife nodes.
+
+`successor` on a level-k node computes nine successors of level k-1
+nodes, then (for the largest step sizes) four more, one after the other.
+Those are independent: `ParallelSuccessors` ships them to a process pool
+instead, as compact subtrees (see `pack`), and merges the results back
+through `join` (so they are canonical nodes of the parent) into the
+parent's successor tables.
+
+It plugs in as a store (see `hashlife.use_store`), so only misses of
+nodes of level `min_level` and above go to the pool; smaller nodes are
+not worth the round trip:
+
+    with multiprocessing.get_context("spawn").Pool(8) as pool:
+        use_store(ParallelSuccessors(pool, min_level=10))
+        node, gens = ffwd(node, 20)
+        use_store(None)
+
+Workers keep their tables between tasks (they warm up like the parent),
+and can read a shared `diskstore.SharedStore` given as `store` (it is
+also looked up by the parent first).
+"""
+import numpy as np
+
+from gol.hl.hashlife import (
+    join, get_zero, from_cells, successor, cached_successor, cache_successor,
+    get_rule, set_rule, use_store
+)
+
+
+def pack(node):
+    """
+    The subtree of `node` (level >= 3) as bytes: one record
+    (k, a, b, c, d) per distinct non-empty node, children first,
+    the children being record numbers (-1 if empty), or the cell masks
+    of the level-2 children of a level-3 node. The root is the last record.
+    """
+    numbers = {}
+    records = []
+    stack = [node]
+    while stack:
+        m = stack[-1]
+        if m in numbers:
+            stack.pop()
+            continue
+        quads = (m.a, m.b, m.c, m.d)
+        if m.k == 3:
+            refs = [q.cells for q in quads]
+        else:
+            pending = [q for q in quads if q.n > 0 and q not in numbers]
+            if pending:
+                stack.extend(pending)
+                continue
+            refs = [numbers[q] if q.n > 0 else -1 for q in quads]
+        stack.pop()
+        numbers[m] = len(records)
+        records.append([m.k] + refs)
+    return np.array(records, dtype=np.int64).tobytes()
+
+
+def unpack(data):
+    """The node of `pack` bytes, built through `join`."""
+    nodes = []
+    for k, *refs in np.frombuffer(data, dtype=np.int64).reshape(-1, 5).tolist():
+        if k == 3:
+            nodes.append(join(*[from_cells(cells, 2) for cells in refs]))
+        else:
+            z = get_zero(k - 1)
+            nodes.append(join(*[nodes[r] if r >= 0 else z for r in refs]))
+    return nodes[-1]
+
+
+def _successor_task(task):
+    """Run in a worker: the packed successor of a packed node."""
+    data, j, rule = task
+    set_rule(rule)
+    # a forked worker inherits the store of the parent: never recurse
+    # into the pool from a worker
+    store = use_store(None)
+    use_store(store.store if isinstance(store, ParallelSuccessors) else store)
+    return pack(successor(unpack(data), j))
+
+
+class ParallelSuccessors:
+    """
+    A successor "store" (see `hashlife.use_store`) computing the successors
+    of nodes of level `min_level` and above with the process pool `pool`
+    (e.g., `multiprocessing.Pool`), looking them up in `store` first.
+    """
+
+    def __init__(self, pool, min_level=10, store=None):
+        assert min_level >= 5, "subtrees must be level 3 or above"
+        self.pool = pool
+        self.min_level = min_level
+        self.store = store
+        self.tasks = 0
+
+    def _map(self, nodes, j):
+        """The successors of `nodes`, computed by the pool when missing."""
+        results = {}
+        missing = []
+        for m in nodes:
+            if m in results or m in missing:
+                continue
+            s = cached_successor(m, j) if m.n > 0 else m.a
+            if s is None and self.store is not None:
+                s = self.store.successor(m, j)
+            if s is None:
+                missing.append(m)
+            else:
+                results[m] = s
+        if missing:
+            rule = get_rule()
+            self.tasks += len(missing)
+            packed = self.pool.map(_successor_task, [(pack(m), j, rule) for m in missing])
+            for m, data in zip(missing, packed):
+                s = results[m] = unpack(data)
+                cache_successor(m, j, s)
+        return [results[m] for m in nodes]
+
+    def successor(self, m, j):
+        """The successor of `m` (2**j generations), or None if `m` is
+        below `min_level` (see `hashlife.successor`)."""
+        if self.store is not None:
+            s = self.store.successor(m, j)
+            if s is not None:
+                return s
+        if m.k < self.min_level or m.n == 0:
+            return None
+        c1, c2, c3, c4, c5, c6, c7, c8, c9 = self._map([
+            join(m.a.a, m.a.b, m.a.c, m.a.d),
+            join(m.a.b, m.b.a, m.a.d, m.b.c),
+            join(m.b.a, m.b.b, m.b.c, m.b.d),
+            join(m.a.c, m.a.d, m.c.a, m.c.b),
+            join(m.a.d, m.b.c, m.c.b, m.d.a),
+            join(m.b.c, m.b.d, m.d.a, m.d.b),
+            join(m.c.a, m.c.b, m.c.c, m.c.d),
+            join(m.c.b, m.d.a, m.c.d, m.d.c),
+            join(m.d.a, m.d.b, m.d.c, m.d.d),
+        ], j)
+        if j < m.k - 2:
+            return join(
+                join(c1.d, c2.c, c4.b, c5.a),
+                join(c2.d, c3.c, c5.b, c6.a),
+                join(c4.d, c5.c, c7.b, c8.a),
+                join(c5.d, c6.c, c8.b, c9.a),
+            )
+        return join(*self._map([
+            join(c1, c2, c4, c5),
+            join(c2, c3, c5, c6),
+            join(c4, c5, c7, c8),
+            join(c5, c6, c8, c9),
+        ], j))
@@ -1,12 +1,20 @@
 from gol.hl.hashlife import (
-    join, successor,
+    join, successor, join_info, successor_info, same_structure, Node,
+    collect, register_root, unregister_root, set_max_memory, gc_info,
+    instrument, level_info, set_monitor, NODE_BYTES, SUCCESSOR_BYTES,
+    life, life_4x4, life_8x8, from_cells,
     on, off,
-    construct, centre, expand, inner,
+    construct, construct_from_array, construct_from_coords, morton, centre, expand, inner,
+    expand_array, expand_raster, render, render_img,
+    bounding_box, population_in, get_cell, set_cell, clear_region, paste,
+    xor, and_, or_, difference, shift,
     pad, crop, is_padded, get_zero,
-    advance,
-    ffwd,
+    advance, advance_torus, advance_bounded,
+    get_rule, set_rule, parse_rule, rule_string,
+    ffwd, step, successor_tables, clear_successors,
 )
 from gol.hl.baseline import baseline_life
+from gol.hl.testing import dense_life
 from gol.hl.lifeparsers import autoguess_life_file
 from itertools import product
 import os
@@ -24,8 +32,124 @@ def test_bootstrap():
         boot_4x4 = product_tree(boot_2x2)
         centres = {p: successor(p, 1) for p in boot_4x4}
 
-        assert join.cache_info().currsize == 65536 + 16
-        assert successor.cache_info().currsize == 65536
+        assert join_info().currsize == 65536 + 16
+        assert successor_info().currsize == 65536
+
+
+def test_life_4x4():
+    for cells in range(0, 1 << 16, 37):
+        m = from_cells(cells, 2)
+        assert m.cells == cells
+        expected = join(
+            life(m.a.a, m.a.b, m.b.a, m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a),
+            life(m.a.b, m.b.a, m.b.b, m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b),
+            life(m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a, m.c.c, m.c.d, m.d.c),
+            life(m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b, m.c.d, m.d.c, m.d.d),
+        )
+        assert life_4x4(m) is expected
+
+
+def test_life_8x8():
+    import random
+    rng = random.Random(8)
+    for _ in range(200):
+        pts = {(rng.randrange(8), rng.randrange(8)) for _ in range(rng.randrange(40))}
+        m = join(*[
+            from_cells(sum(1 << (4 * y + x) for x in range(4) for y in range(4) if (x + qx, y + qy) in pts), 2)
+            for qx, qy in [(0, 0), (4, 0), (0, 4), (4, 4)]
+        ])
+        gen1 = baseline_life(pts)
+        gen2 = baseline_life(gen1)
+        for j, gen in [(0, gen1), (1, gen2)]:
+            expected = sorted((x - 2, y - 2) for x, y in gen if 2 <= x < 6 and 2 <= y < 6)
+            assert sorted((x, y) for x, y, g in expand(life_8x8(m, j))) == expected
+
+
+def test_join_canonical():
+    node = construct([(0, 0), (1, 2), (5, 3), (7, 7)])
+    assert join(node.a, node.b, node.c, node.d) is node
+    duplicates = join_info().duplicates
+    # a copy built outside of `join` is folded back onto the table node
+    copy_a = Node(node.a.k, node.a.n, node.a.hash, node.a.a, node.a.b, node.a.c, node.a.d)
+    assert copy_a is not node.a and same_structure(copy_a, node.a)
+    assert join(copy_a, node.b, node.c, node.d) is node
+    assert join_info().duplicates == duplicates + 1
+
+
+def test_collect():
+    kept = pad(construct([(0, 0), (1, 0), (2, 0), (2, 1), (1, 2)]))  # glider
+    dropped = construct([(x, x * x % 7) for x in range(20)])
+    register_root(kept)
+    advance(dropped, 16)
+    kept_next = successor(kept)
+    info = collect()
+    assert info.nodes > 0 and info.successors > 0
+    assert join(dropped.a, dropped.b, dropped.c, dropped.d) is not dropped
+    # kept nodes stay canonical and their successors stay cached
+    assert join(kept.a, kept.b, kept.c, kept.d) is kept
+    misses = successor_info().misses
+    assert successor(kept) is kept_next
+    assert successor_info().misses == misses
+    unregister_root(kept)
+
+
+def test_max_memory():
+    pat = [(x, x * x % 7) for x in range(20)]
+    expected = sorted(expand(ffwd(construct(pat), 6)[0]))
+    collect()
+    collections = gc_info()["collections"]
+    set_max_memory(0.01)
+    try:
+        node, gens = ffwd(construct(pat), 6)
+    finally:
+        set_max_memory(None)
+    assert gc_info()["collections"] > collections
+    assert sorted(expand(node)) == expected
+
+
+def test_level_info():
+    pat = [(x, x * x % 7) for x in range(20)]
+    reports = []
+    instrument()
+    set_monitor(reports.append, seconds=0)
+    try:
+        misses = successor_info().misses
+        node, gens = ffwd(construct(pat), 6)
+        levels = level_info()
+        assert sum(info.misses for info in levels.values()) == successor_info().misses - misses
+        assert reports and all(isinstance(report, dict) for report in reports)
+        assert all(info.seconds > 0 for info in levels.values() if info.misses)
+        assert sum(info.nodes for info in levels.values()) == join_info().currsize
+        info = levels[4]
+        assert info.bytes == info.nodes * NODE_BYTES + info.successors * SUCCESSOR_BYTES
+        assert not any(info.recomputed for info in levels.values())
+        # successors dropped by a collection are counted when computed again
+        collect()
+        ffwd(construct(pat), 6)
+        assert any(info.recomputed for info in level_info().values())
+    finally:
+        set_monitor(None)
+        instrument(False)
+    assert level_info()[4].hits == 0
+
+
+def test_step():
+    pat = [(x, x * x % 7) for x in range(20)]
+    node = construct(pat)
+    clear_successors(5)
+    roots = list(step(node, 5, 4))
+    assert len(roots) == 4
+    for i, root in enumerate(roots):
+        assert root is advance(node, 32 * (i + 1))
+    sizes = successor_tables()
+    assert sizes[5] > 0
+    # a second run at the same step size only reads the table
+    misses = successor_info().misses
+    assert list(step(node, 5, 4)) == roots
+    assert successor_info().misses == misses
+    assert successor_tables() == sizes
+    clear_successors(5)
+    assert 5 not in successor_tables()
 
 
 test_fname = "input/lifep/gun30.lif"
@@ -46,9 +170,74 @@ def test_advance():
     assert ffwd(get_zero(8), 4)[0].n == 0
 
 
+def test_advance_torus():
+    import numpy as np
+    rng = np.random.default_rng(16)
+    for size in [4, 16, 32]:
+        board = rng.uniform(size=(size, size)) < 0.4
+        node = construct_from_array(board, padded=False)
+        assert node.k == size.bit_length() - 1
+        for n in [1, 2, 5, 16, 45]:
+            assert (expand_raster(advance_torus(node, n)) == dense_life(board, n, True)).all()
+
+
+def test_advance_bounded():
+    import numpy as np
+    rng = np.random.default_rng(17)
+    for size in [16, 13, 32]:
+        board = rng.uniform(size=(size, size)) < 0.4
+        node = construct_from_array(board, padded=False)
+        for n in [1, 2, 5, 16, 45]:
+            raster = expand_raster(advance_bounded(node, n, size))
+            assert not raster[size:].any() and not raster[:, size:].any()
+            assert (raster[:size, :size] == dense_life(board, n, False)).all()
+
+
+def test_rules():
+    import numpy as np
+    rng = np.random.default_rng(20)
+    board = rng.uniform(size=(32, 32)) < 0.4
+    life_next = advance_torus(construct_from_array(board, padded=False), 7)
+    assert get_rule() == ((2, 3), (3,))
+    for rule in [[[2, 3], [3, 6]], [[1, 3, 5, 7], [1, 3, 5, 7]], [[], [2]], "B36/S125"]:
+        previous = set_rule(rule)
+        try:
+            key = get_rule()
+            assert rule_string(key) == rule_string(parse_rule(rule_string(key)))
+            node = construct_from_array(board, padded=False)
+            for n in [1, 2, 7, 20]:
+                raster = expand_raster(advance_torus(node, n))
+                assert (raster == dense_life(board, n, True, key)).all()
+            raster = expand_raster(advance_bounded(node, 9, 32))
+            assert (raster[:32, :32] == dense_life(board, 9, False, key)).all()
+        finally:
+            set_rule(previous)
+    # giant leaps of rules spreading at the speed of light
+    for rule in ["B2/S", "B1/S1", "B1/S"]:
+        previous = set_rule(rule)
+        try:
+            pair, gens = ffwd(construct([(0, 0), (1, 0)]), 2)
+            assert pair.n == advance(construct([(0, 0), (1, 0)]), gens).n > 0
+            for _ in range(5):
+                soup = rng.uniform(size=(6, 6)) < 0.5
+                node, gens = ffwd(construct_from_array(soup), 2)
+                dense = dense_life(np.pad(soup, gens + 1), gens, False, get_rule())
+                ys, xs = np.nonzero(dense)
+                assert align([(x, y) for x, y, g in expand(node)]) == align(list(zip(xs.tolist(), ys.tolist())))
+        finally:
+            set_rule(previous)
+    # the tables of each rule are kept apart
+    tables = successor_tables()
+    assert advance_torus(construct_from_array(board, padded=False), 7) is life_next
+    assert successor_tables() == tables
+    assert parse_rule("B3/S23") == get_rule() and rule_string([[3, 2], [3]]) == "B3/S23"
+
+
 def test_ffwd_large():
     pat, _ = autoguess_life_file("input/lifep/breeder.lif")
+    duplicates = join_info().duplicates
     ffwd(construct(pat), 64)
+    assert join_info().duplicates == duplicates
 
 
 def test_get_zero():
@@ -78,6 +267,126 @@ def test_gray():
         assert gray_sum == total_on / (2 ** (l * 2))
 
 
+def test_expand_array():
+    import numpy as np
+    pat, _ = autoguess_life_file("input/hl_lifep/breeder.lif")
+    node = advance(construct(pat), 100)
+    for level in range(4):
+        expected = expand(node, level=level)
+        xs, ys, grays = expand_array(node, level=level)
+        assert list(zip(xs.tolist(), ys.tolist(), grays.tolist())) == expected
+        raster = expand_raster(node, level=level)
+        assert raster.shape == (2 ** (node.k - level),) * 2
+        assert raster.sum() == sum(g for x, y, g in expected)
+        assert all(raster[y, x] == g for x, y, g in expected)
+    # clip is inclusive, the raster starts at its top-left corner
+    clip = (40, 90, 35, 120)
+    xs, ys, grays = expand_array(node, clip=clip)
+    inside = [(x, y) for x, y, g in expand(node) if 40 <= x <= 90 and 35 <= y <= 120]
+    assert list(zip(xs.tolist(), ys.tolist())) == inside
+    raster = expand_raster(node, clip=clip)
+    assert raster.shape == (86, 51)
+    assert sorted(zip(*np.nonzero(raster.T))) == sorted((x - 40, y - 35) for x, y in inside)
+
+
+def test_render():
+    from gol.hl import hashlife
+    node = advance(construct(test_pattern), 300)
+    for level in range(3):
+        assert (render(node, level) == expand_raster(node, level=level)).all()
+    viewport = (10, 60, 20, 50)
+    assert (render(node, 1, viewport) == expand_raster(node, clip=viewport, level=1)).all()
+    # small nodes are drawn once, and dropped with the nodes by `collect`
+    assert len(hashlife._tiles[1]) > 0
+    collect()
+    assert all(hashlife.join(m.a, m.b, m.c, m.d) is m for m in hashlife._tiles[1])
+    # the cap holds within a single call
+    max_tiles, hashlife.MAX_TILES = hashlife.MAX_TILES, 10
+    try:
+        hashlife._tiles[0].clear()
+        assert (render(node) == expand_raster(node)).all()
+        assert 0 < len(hashlife._tiles[0]) <= 10
+    finally:
+        hashlife.MAX_TILES = max_tiles
+    img = render_img(node, level=0, show=False)
+    assert img.sum() == node.n
+    assert img[0].any() and img[:, 0].any()
+
+
+def test_bounding_box():
+    node = advance(construct(test_pattern), 777)
+    pts = [(x, y) for x, y, g in expand(node)]
+    xs, ys = [x for x, y in pts], [y for x, y in pts]
+    assert bounding_box(node) == (min(xs), max(xs), min(ys), max(ys))
+    assert bounding_box(get_zero(5)) is None
+    for rect in [(0, 2 ** node.k, 0, 2 ** node.k), (40, 90, 35, 120), (-3, 60, 70, 70), (5, 4, 0, 9)]:
+        x1, x2, y1, y2 = rect
+        expected = sum(1 for x, y in pts if x1 <= x <= x2 and y1 <= y <= y2)
+        assert population_in(node, rect) == expected
+        assert population_in(node, (x1 + 7, x2 + 7, y1 - 3, y2 - 3), 7, -3) == expected
+
+
+def test_edit():
+    node = advance(construct(test_pattern), 123)
+    pts = {(x, y) for x, y, g in expand(node)}
+    size = 2 ** node.k
+    assert all(get_cell(node, x, y) == ((x, y) in pts) for x in range(0, size, 3) for y in range(0, size, 5))
+    cell = min(pts)
+    edited = set_cell(set_cell(node, 3, 4), *cell, alive=False)
+    assert {(x, y) for x, y, g in expand(edited)} == (pts | {(3, 4)}) - {cell}
+    # untouched quadrants are shared
+    edited = set_cell(node, 3, 4)
+    assert (edited.b, edited.c, edited.d) == (node.b, node.c, node.d)
+    assert set_cell(node, *cell) is node
+
+    cleared = clear_region(node, (10, 70, 5, 40))
+    assert {(x, y) for x, y, g in expand(cleared)} == {
+        (x, y) for x, y in pts if not (10 <= x <= 70 and 5 <= y <= 40)
+    }
+    assert clear_region(node, (0, size, 0, size)) is get_zero(node.k)
+
+    pattern = construct([(0, 0), (1, 1), (2, 2), (7, 0)])
+    cells = {(x, y) for x, y, g in expand(pattern)}
+    side = 2 ** pattern.k
+    for x, y in [(0, 0), (16, 32), (5, 9), (size - 3, size - 3), (-4, 7)]:
+        pasted = paste(node, pattern, x, y)
+        expected = {(px, py) for px, py in pts if not (x <= px < x + side and y <= py < y + side)}
+        expected |= {(px + x, py + y) for px, py in cells if 0 <= px + x < size and 0 <= py + y < size}
+        assert {(px, py) for px, py, g in expand(pasted)} == expected
+
+
+def test_set_algebra():
+    node = advance(construct(test_pattern), 77)
+    other = advance(node, 5)
+    cells = lambda m: {(x, y) for x, y, g in expand(m)}
+    p, q = cells(node), cells(other)
+    assert cells(xor(node, other)) == p ^ q
+    assert cells(and_(node, other)) == p & q
+    assert cells(or_(node, other)) == p | q
+    assert cells(difference(node, other)) == p - q
+    # identical and empty operands
+    assert xor(node, node) is get_zero(node.k)
+    assert and_(node, node) is node and or_(node, get_zero(node.k)) is node
+    assert difference(node, get_zero(3)) is node
+    # operands of different levels are aligned on their top-left corners
+    small = construct([(0, 0), (1, 0), (5, 3)])
+    assert cells(or_(small, node)) == p | cells(small)
+    assert xor(small, _grow_to(small, node.k)).n == 0
+
+    size = 2 ** node.k
+    for dx, dy in [(0, 0), (3, -5), (-17, 40), (size, 0)]:
+        assert cells(shift(node, dx, dy)) == {
+            (x + dx, y + dy) for x, y in p if 0 <= x + dx < size and 0 <= y + dy < size
+        }
+
+
+def _grow_to(node, k):
+    while node.k < k:
+        z = get_zero(node.k)
+        node = join(node, z, z, z)
+    return node
+
+
 def verify_clipped(node, x1, y1, x2, y2):
     pts = expand(node, clip=(x1, y1, x2, y2))
     assert all([x >= x1 and x <= x2 and y > y1 and y < y2 for x, y in pts])
@@ -126,6 +435,41 @@ def test_construct():
     validate_tree(node)
 
 
+def test_construct_from_array():
+    import numpy as np
+    board = np.zeros((21, 37), dtype=bool)
+    for x, y in test_pattern:
+        board[y + 3, x] = True
+    node = construct_from_array(board)
+    validate_tree(node)
+    assert is_padded(node)
+    assert same_pattern(test_pattern, expand(node))
+    # bit-packed rows build the same (canonical) node
+    assert construct_from_array(np.packbits(board, axis=1), width=37) is node
+    assert construct_from_array(np.zeros((3, 3))).n == 0
+
+
+def test_construct_from_coords():
+    import numpy as np
+    assert morton([0, 1, 0, 1, 2], [0, 0, 1, 1, 0]).tolist() == [0, 1, 2, 3, 4]
+    xs = np.array([x - 100 for x, y in test_pattern] + [-100])
+    ys = np.array([y + 7 for x, y in test_pattern] + [9])
+    node, (x, y) = construct_from_coords(xs, ys)
+    validate_tree(node)
+    assert is_padded(node)
+    # the original coordinates are kept
+    assert sorted((px, py) for px, py, g in expand(node, x, y)) == sorted(set(zip(xs, ys)))
+    assert construct_from_coords([5], [5])[0].n == 1
+    # far from the origin is fine, spanning 2**32 cells is not
+    node, (x, y) = construct_from_coords([1 << 40, (1 << 40) + 3], [-(1 << 40), 5 - (1 << 40)])
+    assert sorted((px, py) for px, py, g in expand(node, x, y)) == [
+        (1 << 40, -(1 << 40)), ((1 << 40) + 3, 5 - (1 << 40))
+    ]
+    import pytest
+    with pytest.raises(AssertionError):
+        construct_from_coords([0, 1 << 33], [0, 5])
+
+
 def test_centre():
     node = construct(test_pattern)
     for i in range(5):
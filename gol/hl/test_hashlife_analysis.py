@@ -0,0 +1,92 @@
+import numpy as np
+
+from gol.hl.hashlife import (
+    construct, construct_from_coords, expand, advance, successor_info
+)
+from gol.hl.analysis import (
+    canonical, step_one, find_period, sample, linear_schedule, exponential_schedule
+)
+from gol.hl.baseline import baseline_life
+from gol.hl.lifeparsers import parse_rle
+
+glider = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+blinker = [(0, 1), (1, 1), (2, 1)]
+block = [(0, 0), (1, 0), (0, 1), (1, 1)]
+# lightweight spaceship, moving left
+lwss = [(1, 0), (4, 0), (0, 1), (0, 2), (4, 2), (0, 3), (1, 3), (2, 3), (3, 3)]
+
+
+def test_canonical():
+    for dx, dy in [(0, 0), (5, 0), (13, 21), (-40, 7)]:
+        moved, (x, y) = construct_from_coords([x + dx for x, y in glider], [y + dy for x, y in glider])
+        node, pos = canonical(moved, x, y)
+        assert node is canonical(construct(glider))[0]
+        assert pos == (dx, dy)
+
+
+def test_step_one():
+    node, (x, y) = construct_from_coords([x for x, y in glider], [y for x, y in glider])
+    pts = glider
+    for gen in range(12):
+        assert sorted((px + x, py + y) for px, py, g in expand(node)) == sorted(pts)
+        node, x, y = step_one(node, x, y)
+        pts = baseline_life(pts)
+
+
+def test_find_period():
+    assert find_period(construct(block)) == (1, (0, 0), 0)
+    assert find_period(construct(blinker)) == (2, (0, 0), 0)
+    assert find_period(construct(glider)) == (4, (1, 1), 0)
+    assert find_period(construct(lwss)) == (4, (-2, 0), 0)
+    # a pre-block (3 cells of a block) becomes a block after one generation
+    assert find_period(construct(block[:3])) == (1, (0, 0), 1)
+    # dies out
+    assert find_period(construct([(0, 0), (5, 5)])) == (1, (0, 0), 1)
+    # Gosper gun: grows forever
+    gun, _ = parse_rle("""x = 36, y = 9, rule = B3/S23
+24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$
+10bo5bo7bo$11bo3bo$12b2o!""")
+    assert find_period(construct(gun), max_gens=100) is None
+
+
+def test_sample():
+    assert linear_schedule(10, 4).tolist() == [0, 4, 8]
+    assert exponential_schedule(100).tolist() == [0, 1, 2, 4, 8, 16, 32, 64]
+    assert exponential_schedule(10, 1.5).tolist() == [0, 1, 2, 3, 5, 8]
+    # generation by generation, in the same coordinates as `step_one`
+    node, (x, y) = construct_from_coords([x for x, y in lwss], [y for x, y in lwss])
+    samples = sample(node, linear_schedule(40, 5), x, y)
+    gen = 0
+    assert not samples.empty.any()
+    for g, pop, box, _ in zip(*samples):
+        while gen < g:
+            node, x, y = step_one(node, x, y)
+            gen += 1
+        pts = [(px + x, py + y) for px, py, _ in expand(node)]
+        assert pop == len(pts)
+        assert box.tolist() == [
+            min(p[0] for p in pts), max(p[0] for p in pts),
+            min(p[1] for p in pts), max(p[1] for p in pts),
+        ]
+    # glider: the box moves by (1, 1) every 4 generations
+    samples = sample(construct(glider), exponential_schedule(1 << 40, 4))
+    assert np.all(samples.population == 5) and samples.bbox.dtype == np.int64
+    # exact beyond 2**53: 2**60 generations move the glider by 2**58
+    far = sample(construct(glider), [0, 1 << 60])
+    assert far.bbox[1].tolist() == [c + (1 << 58) for c in far.bbox[0].tolist()]
+    assert np.all(np.diff(samples.bbox[2:, 0]) == np.diff(samples.generations[2:]) // 4)
+    # the population of an explicit schedule, and an empty pattern
+    gun = construct(parse_rle("""x = 36, y = 9, rule = B3/S23
+24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$
+10bo5bo7bo$11bo3bo$12b2o!""")[0])
+    gens = [0, 30, 30, 1000, 1234]
+    assert sample(gun, gens).population.tolist() == [advance(gun, g).n for g in gens]
+    empty = sample(construct([(0, 0), (5, 5)]), [0, 1, 5])
+    assert empty.population.tolist() == [2, 0, 0] and empty.empty.tolist() == [False, True, True]
+    # a second run only hits the successor tables
+    first = sample(gun, linear_schedule(3000, 300))
+    misses = successor_info().misses
+    again = sample(gun, linear_schedule(3000, 300))
+    assert successor_info().misses == misses
+    assert np.array_equal(first.population, again.population)
+    assert np.array_equal(first.bbox, again.bbox)
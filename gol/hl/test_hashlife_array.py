@@ -0,0 +1,88 @@
+import random
+from gol.hl import hashlife
+from gol.hl.baseline import baseline_life
+from gol.hl.hashlife_array import ArrayHashLife, LEAF_LEVEL, life_16x16
+from gol.hl.testing import test_pattern
+
+
+def test_join_unique():
+    hl = ArrayHashLife(capacity=4)
+    on, off = hl.leaf(0b101), hl.leaf(0)
+    assert hl.leaf(0b101) == on
+    assert hl.k[on] == LEAF_LEVEL and hl.n[on] == 2
+    a = hl.join(on, off, off, on)
+    assert hl.join(on, off, off, on) == a
+    assert hl.k[a] == 4 and hl.n[a] == 4
+    # grow well past the initial capacity
+    nodes = [hl.construct([(x, y), (y, x + 3)]) for x in range(20) for y in range(20)]
+    assert nodes == [hl.construct([(x, y), (y, x + 3)]) for x in range(20) for y in range(20)]
+    assert hl.join(on, off, off, on) == a
+
+
+def test_get_zero():
+    hl = ArrayHashLife()
+    for i in range(LEAF_LEVEL, 32):
+        z = hl.get_zero(i)
+        assert hl.k[z] == i
+        assert hl.n[z] == 0
+
+
+def test_life_16x16():
+    rng = random.Random(16)
+    for _ in range(50):
+        pts = {(rng.randrange(16), rng.randrange(16)) for _ in range(rng.randrange(150))}
+        leaves = [
+            sum(1 << (8 * y + x) for x in range(8) for y in range(8) if (x + qx, y + qy) in pts)
+            for qx, qy in [(0, 0), (8, 0), (0, 8), (8, 8)]
+        ]
+        for gens in range(1, 5):
+            pts = baseline_life(pts)
+            expected = sum(1 << (8 * (y - 4) + x - 4) for x, y in pts if 4 <= x < 12 and 4 <= y < 12)
+            assert life_16x16(*leaves, gens) == expected
+
+
+def test_expand_leaves():
+    hl = ArrayHashLife()
+    pts = [(x, (x * 7) % 13) for x in range(30)]
+    node = hl.construct(pts)
+    node_ref = hashlife.construct(pts)
+    for level in range(5):
+        assert sorted(hl.expand(node, level=level)) == sorted(hashlife.expand(node_ref, level=level))
+    clip = (3, 20, 2, 9)
+    assert sorted(hl.expand(node, clip=clip)) == sorted(hashlife.expand(node_ref, clip=clip))
+
+
+def test_advance():
+    hl = ArrayHashLife(capacity=16)
+    node = hl.construct(test_pattern)
+    node_ref = hashlife.construct(test_pattern)
+    for i in [0, 1, 2, 7, 30, 64, 121]:
+        expected = sorted(hashlife.expand(hashlife.advance(node_ref, i)))
+        assert sorted(hl.expand(hl.advance(node, i))) == expected
+
+
+def test_ffwd():
+    hl = ArrayHashLife()
+    node, gens = hl.ffwd(hl.construct(test_pattern), 8)
+    node_ref, gens_ref = hashlife.ffwd(hashlife.construct(test_pattern), 8)
+    assert gens == gens_ref
+    assert hl.k[node] == node_ref.k and hl.n[node] == node_ref.n
+    assert sorted(hl.expand(node)) == sorted(hashlife.expand(node_ref))
+    # the second run is served from the successor table
+    hits, misses, _, _ = hl.cache_info()
+    hl.ffwd(hl.construct(test_pattern), 8)
+    assert hl.cache_info()[1] == misses
+    assert hl.cache_info()[0] > hits
+
+
+def test_bytes_per_node():
+    hl = ArrayHashLife(capacity=16)
+    hl.ffwd(hl.construct(test_pattern), 16)
+    # an order of magnitude below the ~430 bytes of a `hashlife.Node` with
+    # its cache entries: 29 bytes in the node arrays, giant-leap successors
+    # included, plus the growth slack and the unique table
+    assert hl.bytes_per_node() < 43
+    # (ffwd only takes giant leaps: the successor table stays empty)
+    assert len(hl.succ_keys) == 16
+    hl.advance(hl.construct(test_pattern), 1000)
+    assert hl.bytes_per_node() < 43
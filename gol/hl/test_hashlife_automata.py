@@ -0,0 +1,47 @@
+import numpy as np
+from gol.hl.automata import HashlifeAutomata
+from gol.hl.hashlife import set_max_memory
+from gol.hl.testing import dense_life
+
+
+def test_automata():
+    rng = np.random.default_rng(22)
+    for size, torus in [(16, True), (2, True), (32, True), (13, False), (16, False)]:
+        for rule in [[[2, 3], [3]], [[2, 3], [3, 6]]]:
+            board = (rng.uniform(size=(size, size)) < 0.4).astype(int)
+            automata = HashlifeAutomata(board=board, rule=rule, torus=torus)
+            assert (automata.get_board_numpy(change_to_int=True) == board).all()
+            expected = board
+            for n in [1, 3, 40]:
+                automata.advance(n)
+                expected = dense_life(expected, n, torus, rule)
+                assert (automata.get_board_numpy(change_to_int=True) == expected).all()
+            assert automata.get_board_numpy(change_to_bool=True).dtype == bool
+
+
+def test_cycle_period():
+    blinker = np.zeros((8, 8), dtype=int)
+    blinker[3, 2:5] = 1
+    automata = HashlifeAutomata(board=blinker, torus=True)
+    assert automata.get_cycle_period(advance_gen=5) == 2
+    # a glider comes back after 4 * 8 generations on an 8x8 torus
+    glider = np.zeros((8, 8), dtype=int)
+    glider[0, 1] = glider[1, 2] = glider[2, 0] = glider[2, 1] = glider[2, 2] = 1
+    automata.set_board(glider)
+    assert automata.get_cycle_period(advance_gen=0) == 32
+    # away from a torus it ends as a block in the corner
+    automata = HashlifeAutomata(board=glider, torus=False)
+    assert automata.get_cycle_period() == 1
+    assert (automata.get_board_numpy(change_to_int=True) == dense_life(glider, 100, False)).all()
+
+    # the first board survives the collections of a tiny memory budget
+    pulsar = np.zeros((32, 32), dtype=int)
+    for x in [2, 7, 9, 14]:
+        for y in [4, 5, 6, 10, 11, 12]:
+            pulsar[y + 6, x + 6] = pulsar[x + 6, y + 6] = 1
+    automata = HashlifeAutomata(board=pulsar, torus=False)
+    set_max_memory(0.0001)
+    try:
+        assert automata.get_cycle_period(advance_gen=0) == 3
+    finally:
+        set_max_memory(None)
@@ -0,0 +1,111 @@
+import os
+import multiprocessing
+import pytest
+from gol.hl.hashlife import (
+    construct, advance, expand, use_store, clear_successors, collect, successor_info,
+    set_rule
+)
+from gol.hl.diskstore import DiskStore, SharedStore
+from gol.hl.testing import test_pattern
+
+
+def run(store, n=500):
+    use_store(store)
+    try:
+        return sorted(expand(advance(construct(test_pattern), n)))
+    finally:
+        use_store(None)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "gun.hls")
+    clear_successors()
+    store = DiskStore(path)
+    expected = run(store)
+    assert store.hits == 0
+    store.save()
+    assert len(store) > 0 and os.path.exists(path)
+
+    # new "processes" (empty tables) with read-only stores
+    for worker in [DiskStore(path, readonly=True) for _ in range(2)]:
+        clear_successors()
+        collect()
+        misses = successor_info().misses
+        assert run(worker) == expected
+        # every miss is served by the store, nothing is computed
+        assert worker.hits > 0
+        assert successor_info().misses - misses == worker.hits
+
+    # saving again only adds what is new
+    size = len(store)
+    store.save()
+    assert len(store) == size
+
+
+def test_max_mb(tmp_path):
+    path = str(tmp_path / "gun.hls")
+    clear_successors()
+    store = DiskStore(path, max_mb=0.05)
+    expected = run(store, 2000)
+    store.save()
+    assert 0 < os.path.getsize(path) <= 0.05 * 2 ** 20
+    clear_successors()
+    collect()
+    assert run(DiskStore(path, readonly=True), 2000) == expected
+
+
+def test_store_rule(tmp_path):
+    path = str(tmp_path / "highlife.hls")
+    previous = set_rule("B36/S23")
+    try:
+        clear_successors()
+        store = DiskStore(path)
+        highlife = run(store)
+        store.save()
+        shared = SharedStore()
+        assert store.rule == shared.rule == "B36/S23"
+    finally:
+        set_rule(previous)
+    try:
+        # the HighLife successors are never served to a Life run
+        assert run(None) != highlife
+        with pytest.raises(ValueError):
+            DiskStore(path, readonly=True)
+        with pytest.raises(ValueError):
+            use_store(store)
+        with pytest.raises(ValueError):
+            SharedStore(shared.name)
+        with pytest.raises(ValueError):
+            store.reload()
+        set_rule("B36/S23")
+        assert run(DiskStore(path, readonly=True)) == highlife
+    finally:
+        set_rule(previous)
+        shared.unlink()
+
+
+def shared_worker(name):
+    # a fresh (spawned) process: its tables start empty
+    store = SharedStore(name)
+    misses = successor_info().misses
+    try:
+        result = run(store)
+        return result, store.hits, successor_info().misses - misses
+    finally:
+        store.close()
+
+
+def test_shared_store():
+    clear_successors()
+    expected = run(None)
+    store = SharedStore()
+    try:
+        assert len(store) > 0 and not store.nodes.flags.writeable
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            results = pool.map(shared_worker, [store.name] * 2)
+        for result, hits, misses in results:
+            assert result == expected
+            # every miss is served by the shared block
+            assert hits > 0 and misses == hits
+    finally:
+        store.unlink()
@@ -0,0 +1,70 @@
+import numpy as np
+from gol.hl.generations import GenerationsLife
+from gol.hl.testing import dense_generations
+
+
+def normalised(cells):
+    if not cells:
+        return set()
+    x0 = min(x for x, y, s in cells)
+    y0 = min(y for x, y, s in cells)
+    return {(x - x0, y - y0, s) for x, y, s in cells}
+
+
+def test_generations():
+    rng = np.random.default_rng(21)
+    # Brian's Brain, Star Wars, and plain Life
+    for rule, states in [([[], [2]], 3), ([[3, 4, 5], [2]], 4), ([[2, 3], [3]], 2)]:
+        gl = GenerationsLife(rule, states)
+        soup = rng.integers(0, states, size=(16, 16)) * (rng.uniform(size=(16, 16)) < 0.5)
+        board = np.pad(soup, 48)
+        node = gl.construct_from_array(board)
+        assert node.counts[1:] == tuple(np.bincount(soup.ravel(), minlength=states)[1:])
+        for n in [1, 2, 7, 30]:
+            expected = dense_generations(board, n, rule, states)
+            result = gl.advance(node, n)
+            ys, xs = np.nonzero(expected)
+            assert normalised(gl.expand(result)) == normalised(
+                list(zip(xs.tolist(), ys.tolist(), expected[ys, xs].tolist()))
+            )
+            assert result.counts[1:] == tuple(np.bincount(expected.ravel(), minlength=states)[1:])
+
+
+def test_generations_memoized():
+    gl = GenerationsLife([[], [2]], 3)
+    # a Brian's Brain spaceship: repeated copies share their successors
+    ship = [(0, 0, 1), (1, 0, 1), (0, 1, 2), (1, 1, 2)]
+    node = gl.construct([(x + 32 * i, y, s) for i in range(8) for x, y, s in ship])
+    node, gens = gl.ffwd(node, 6)
+    hits, misses, nodes, successors = gl.cache_info()
+    assert hits > misses and node.counts[1] == node.counts[2] == 16
+    # no new successors for the same run
+    gl.ffwd(gl.construct([(x + 32 * i, y, s) for i in range(8) for x, y, s in ship]), 6)
+    assert gl.cache_info()[1] == misses
+    states = [s for x, y, s in gl.expand(node)]
+    assert states.count(1) == states.count(2) == 16
+    small = gl.construct(ship)
+    assert (gl.expand_array(small) > 0).sum() == 4 and gl.expand_array(small).shape == (2 ** small.k,) * 2
+
+
+def test_generations_advance_light_speed():
+    gl = GenerationsLife([[], [2]], 3)
+    # a Brian's Brain spaceship, moving up at the speed of light
+    ship = [(0, 0, 1), (1, 0, 1), (0, 1, 2), (1, 1, 2)]
+    board = np.zeros((80, 8), dtype=np.int64)
+    for x, y, s in ship:
+        board[y + 70, x + 3] = s
+    node = gl.construct_from_array(board)
+    for n in [1, 2, 3, 15, 59]:
+        expected = dense_generations(board, n, [[], [2]], 3)
+        result = gl.advance(node, n)
+        assert result.counts[1:] == (2, 2)
+        ys, xs = np.nonzero(expected)
+        assert normalised(gl.expand(result)) == normalised(
+            list(zip(xs.tolist(), ys.tolist(), expected[ys, xs].tolist()))
+        )
+    # one generation at a time
+    stepped = node
+    for n in range(1, 60):
+        stepped = gl.advance(stepped, 1)
+        assert normalised(gl.expand(stepped)) == normalised(gl.expand(gl.advance(node, n)))
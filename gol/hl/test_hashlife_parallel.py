@@ -0,0 +1,52 @@
+import multiprocessing
+from gol.hl.hashlife import (
+    construct, ffwd, advance, expand, use_store, clear_successors, collect,
+    successor_info, set_rule
+)
+from gol.hl.parallel import ParallelSuccessors, pack, unpack
+from gol.hl.testing import test_pattern, nodes_of
+
+
+def test_pack():
+    node = advance(construct(test_pattern), 300)
+    assert unpack(pack(node)) is node
+    # one 40-byte record per distinct non-empty node of level 3 and above
+    assert len(pack(node)) == 40 * len({m for m in nodes_of(node) if m.k >= 3 and m.n > 0})
+
+
+def test_parallel_successors():
+    expected = sorted(expand(ffwd(construct(test_pattern), 8)[0]))
+    highlife = sorted(expand(_highlife()))
+    clear_successors()
+    collect()
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        parallel = ParallelSuccessors(pool, min_level=6)
+        use_store(parallel)
+        try:
+            misses = successor_info().misses
+            assert sorted(expand(ffwd(construct(test_pattern), 8)[0])) == expected
+            assert parallel.tasks > 0
+            # the parent only computed the small nodes and the top levels
+            assert successor_info().misses - misses < 2000
+            # shipped results stay in the parent's tables
+            tasks = parallel.tasks
+            assert sorted(expand(ffwd(construct(test_pattern), 8)[0])) == expected
+            assert parallel.tasks == tasks
+        finally:
+            use_store(None)
+        # workers run the rule of the parent
+        previous = set_rule("B36/S23")
+        try:
+            use_store(ParallelSuccessors(pool, min_level=6))
+            assert sorted(expand(_highlife())) == highlife
+        finally:
+            use_store(None)
+            set_rule(previous)
+
+
+def _highlife():
+    previous = set_rule("B36/S23")
+    try:
+        return advance(construct(test_pattern), 1000)
+    finally:
+        set_rule(previous)
@@ -0,0 +1,34 @@
+from gol.hl.hashlife import construct, expand, advance, join_info, get_zero
+from gol.hl.macrocell import from_mc, to_mc, read_mc, write_mc
+from gol.hl.testing import test_pattern, nodes_of
+
+# a glider in the top-left 8x8 leaf of a 16x16 node, as written by Golly
+glider_mc = """[M2] (golly 2.0)
+#R B3/S23
+$$..*$...*$.***$$$$
+4 1 0 0 0
+"""
+
+
+def test_from_mc():
+    node, info = from_mc(glider_mc.splitlines())
+    assert node.k == 4 and info == {"rule": "B3/S23", "generation": None}
+    assert sorted((x, y) for x, y, g in expand(node)) == [(1, 4), (2, 2), (2, 4), (3, 3), (3, 4)]
+    assert list(to_mc(node))[2:] == glider_mc.splitlines()[2:]
+
+
+def test_round_trip(tmp_path):
+    node = advance(construct(test_pattern), 1000)
+    lines = list(to_mc(node, generation=1000))
+    assert lines[2] == "#G 1000"
+    # one line per distinct non-empty node of level 3 and above
+    assert len(lines) - 3 == len({m for m in nodes_of(node) if m.k >= 3 and m.n > 0})
+    for fname in ["gun.mc", "gun.mc.gz"]:
+        write_mc(node, str(tmp_path / fname), generation=1000)
+        misses = join_info().misses
+        loaded, info = read_mc(str(tmp_path / fname))
+        # straight back to the same (canonical) nodes
+        assert loaded is node and info["generation"] == 1000
+        assert join_info().misses == misses
+    assert (tmp_path / "gun.mc.gz").stat().st_size < (tmp_path / "gun.mc").stat().st_size
+    assert from_mc(to_mc(get_zero(2)))[0] is get_zero(3)
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from gol.hl.hashlife import construct, construct_from_array, inner, expand_raster, get_zero, join
+from gol.hl.tiles import export_tiles, tile_pixels
+
+
+def test_tile_pixels():
+    node = construct([(x, (x * 3) % 11) for x in range(40)])
+    pixels = tile_pixels(node, tile_size=16)
+    assert pixels.shape == (16, 16)
+    assert (pixels == expand_raster(node, level=node.k - 4)).all()
+    assert set(np.unique(tile_pixels(node, tile_size=16, gray=False))) <= {0.0, 1.0}
+
+
+def test_export_tiles(tmp_path):
+    rng = np.random.default_rng(11)
+    # the 16x16 root, inside its padding
+    block = inner(inner(construct_from_array(rng.uniform(size=(16, 16)) < 0.4)))
+    assert block.k == 4
+    z = get_zero(block.k)
+    # the same block three times, and an empty quarter
+    quad = join(block, z, block, block)
+    node = join(quad, get_zero(quad.k), quad, quad)
+    info = export_tiles(node, str(tmp_path), tile_size=16)
+    assert info["zooms"] == node.k - 4 + 1
+    # 1 root + 3 quads + 9 blocks, but only 3 distinct nodes
+    assert (info["tiles"], info["distinct"]) == (13, 3)
+    assert os.path.exists(tmp_path / "0" / "0" / "0.png")
+    assert not os.path.exists(tmp_path / "1" / "1" / "0.png")
+    assert sorted(os.listdir(tmp_path / "1")) == ["0", "1"]
+    # identical subtrees give identical tiles
+    a = (tmp_path / "2" / "0" / "0.png").read_bytes()
+    assert a == (tmp_path / "2" / "0" / "1.png").read_bytes()
+    img = plt.imread(str(tmp_path / "2" / "0" / "0.png"))
+    assert img.shape[:2] == (16, 16)
+    assert (img[:, :, 0] > 0.5).sum() == block.n
@@ -0,0 +1,53 @@
+"""
+Patterns and dense reference implementations shared by the hashlife tests.
+"""
+import numpy as np
+
+from gol.hl.generations import transition_table
+from gol.hl.lifeparsers import parse_rle
+
+# Gosper glider gun (same pattern as input/lifep/gun30.lif)
+gun_rle = """x = 36, y = 9, rule = B3/S23
+24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$
+10bo5bo7bo$11bo3bo$12b2o!"""
+test_pattern, _ = parse_rle(gun_rle)
+
+
+def nodes_of(node):
+    """The distinct nodes of the tree of `node`."""
+    seen, stack = set(), [node]
+    while stack:
+        m = stack.pop()
+        if m not in seen:
+            seen.add(m)
+            if m.k > 0:
+                stack.extend([m.a, m.b, m.c, m.d])
+    return seen
+
+
+def dense_life(board, n, torus, rule=((2, 3), (3,))):
+    """n generations of a dense board, like `Automata(torus=..., rule=...)`."""
+    board = board.astype(int)
+    h, w = board.shape
+    for _ in range(n):
+        padded = np.pad(board, 1, mode="wrap" if torus else "constant")
+        counts = sum(
+            padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx
+        )
+        board = np.where(board == 1, np.isin(counts, rule[0]), np.isin(counts, rule[1])).astype(int)
+    return board
+
+
+def dense_generations(board, n, rule, states):
+    """n generations of a dense board of states (cells outside are dead)."""
+    table = np.array(transition_table(rule, states))
+    h, w = board.shape
+    for _ in range(n):
+        padded = np.pad(board == 1, 1).astype(int)
+        alive = sum(
+            padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx
+        )
+        board = table[board, alive]
+    return board
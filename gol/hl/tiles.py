@@ -0,0 +1,82 @@
+"""
+Export a hashlife quadtree as a multi-resolution tile pyramid.
+
+The tiles follow the `{z}/{x}/{y}.png` layout of web maps (Leaflet,
+OpenLayers, ...), so the output directory can be served as static files:
+zoom 0 is the whole root in one tile, and the 4**z tiles of zoom `z`
+are exactly the nodes `k - z` levels down the quadtree. The deepest
+zoom shows one cell per pixel.
+
+Empty nodes are skipped (no file is written), and every distinct node
+is rendered and encoded once: identical subtrees reuse the same PNG
+bytes, so the cost follows the number of distinct nodes rather than
+the area of the pattern.
+"""
+import io
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+
+from gol.hl.hashlife import render
+
+
+def encode_png(pixels):
+    """Encode an array of gray levels (0.0 -> 1.0) as PNG bytes."""
+    buf = io.BytesIO()
+    plt.imsave(buf, pixels, cmap="gray", vmin=0.0, vmax=1.0, format="png")
+    return buf.getvalue()
+
+
+def tile_pixels(node, tile_size=256, gray=True):
+    """
+    The tile image of `node`: `tile_size` x `tile_size` gray levels,
+    one pixel per block of cells (the fraction of on cells of the block,
+    or 1.0 for any on cell if `gray` is False).
+    Nodes smaller than a tile are drawn at the top-left corner.
+    """
+    t = tile_size.bit_length() - 1
+    pixels = render(node, max(node.k - t, 0))
+    if not gray:
+        pixels = (pixels > 0).astype(float)
+    if len(pixels) < tile_size:
+        tile = np.zeros((tile_size, tile_size))
+        tile[:len(pixels), :len(pixels)] = pixels
+        pixels = tile
+    return pixels
+
+
+def export_tiles(node, path, tile_size=256, max_zoom=None, gray=True):
+    """
+    Write the tile pyramid of `node` to the directory `path`
+    (`path/{z}/{x}/{y}.png`), from zoom 0 down to `max_zoom`
+    (by default, the zoom with one cell per pixel).
+    `tile_size` must be a power of two.
+    Returns a dict with the number of zoom levels, of tiles written and
+    of distinct tiles encoded.
+    """
+    assert tile_size & (tile_size - 1) == 0, "tile_size must be a power of two"
+    t = tile_size.bit_length() - 1
+    deepest = max(node.k - t, 0)
+    max_zoom = deepest if max_zoom is None else min(max_zoom, deepest)
+
+    encoded = {}  # node -> PNG bytes
+    written = 0
+    tiles = [(node, 0, 0)] if node.n > 0 else []
+    for z in range(max_zoom + 1):
+        for m, x, y in tiles:
+            png = encoded.get(m)
+            if png is None:
+                png = encoded[m] = encode_png(tile_pixels(m, tile_size, gray))
+            folder = os.path.join(path, str(z), str(x))
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"{y}.png"), "wb") as f:
+                f.write(png)
+            written += 1
+        # non-empty children, for the next zoom
+        tiles = [
+            (child, 2 * x + dx, 2 * y + dy)
+            for m, x, y in tiles
+            for child, dx, dy in [(m.a, 0, 0), (m.b, 1, 0), (m.c, 0, 1), (m.d, 1, 1)]
+            if child.n > 0
+        ]
+    return {"zooms": max_zoom + 1, "tiles": written, "distinct": len(encoded)}
@@ -2,7 +2,7 @@ from collections import Counter, defaultdict
 import numpy as np
 from tqdm import tqdm
 from gol.main_pure import init_gol_board_neighborhood_rule
-from gol.main_pure import Automata
+from gol.main_pure import Automata, HashlifeAutomata
 from gol.utils import numpy_to_stars, numpy_to_rle, export_board_cycle_to_gif
 from gol.process_lexicon import get_lex_patterns
 import requests
@@ -132,6 +132,7 @@ def get_board_cycle_period(
         torus=True,
         use_fft = False,
         torch_device = None,
+        use_hashlife = False, # quadtree engine (Moore neighborhood only)
         analyze = False, # all following args only needed if this is True
         min_cycle_period_to_report = 0,
         max_cycle_period_to_report = None,
@@ -180,14 +181,22 @@ def get_board_cycle_period(
 
 
     # init automata
-    automata = Automata(
-        board = board,
-        neighborhood = neighborhood,
-        rule = rule,
-        torus = torus,
-        use_fft = use_fft,
-        torch_device = torch_device,
-    )
+    if use_hashlife:
+        automata = HashlifeAutomata(
+            board = board,
+            neighborhood = neighborhood,
+            rule = rule,
+            torus = torus,
+        )
+    else:
+        automata = Automata(
+            board = board,
+            neighborhood = neighborhood,
+            rule = rule,
+            torus = torus,
+            use_fft = use_fft,
+            torch_device = torch_device,
+        )
 
     # get cycle (list of boards) and period
     automata.advance(iterations=jump_to_generation)
@@ -264,6 +273,7 @@ def run_cycles_stats(
         torus = True,
         use_fft = False,
         torch_device = None,
+        use_hashlife = False,
     ):
     '''
     Used for generate_cycle_analysis()
@@ -300,6 +310,7 @@ def run_cycles_stats(
             torus = torus,
             use_fft = use_fft,
             torch_device = torch_device,
+            use_hashlife = use_hashlife,
             analyze = False
         )
 
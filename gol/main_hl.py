@@ -1,8 +1,8 @@
 import time
 from gol.hl.lifeparsers import autoguess_life_file
 from gol.hl.hashlife import (
-    construct, ffwd, successor, join,
-    expand, advance, centre, render_img
+    construct, ffwd, successor_info, join_info,
+    expand, advance, centre, render_img, instrument, level_info
 )
 import matplotlib.pyplot as plt
 import os
@@ -13,13 +13,17 @@ def load_lif(fname):
     return construct(pat_tuples)
 
 def ffwd_log(inputfile):
+    instrument()
     init_t = time.perf_counter()
     node = load_lif(inputfile)
     print(ffwd(node, 64))
     t = time.perf_counter() - init_t
     print(f'Computation took {t*1000.0:.1f}ms')
-    print(successor.cache_info())
-    print(join.cache_info())
+    print(successor_info())
+    print(join_info())
+    for k, info in level_info().items():
+        print(f'k={k}', info)
+    instrument(False)
 
 
 def expand_routine(inputfile):
@@ -1,5 +1,6 @@
 import numpy as np
 from gol.pure.automata import Automata
+from gol.hl.automata import HashlifeAutomata
 from gol.utils import init_gol_board_neighborhood_rule
 
 def main_pure(
@@ -16,6 +17,7 @@ def main_pure(
         use_fft = False,
         use_poly_update = False,
         torch_device = None,
+        use_hashlife = False, # quadtree engine (Moore neighborhood only)
     ):
 
     # init gol board and rule
@@ -28,15 +30,23 @@ def main_pure(
     )
 
     # init automata
-    automata = Automata(
-        board = board,
-        neighborhood = neighborhood,
-        rule = rule,
-        torus = torus,
-        use_fft = use_fft,
-        use_poly_update = use_poly_update,
-        torch_device = torch_device,
-    )
+    if use_hashlife:
+        automata = HashlifeAutomata(
+            board = board,
+            neighborhood = neighborhood,
+            rule = rule,
+            torus = torus,
+        )
+    else:
+        automata = Automata(
+            board = board,
+            neighborhood = neighborhood,
+            rule = rule,
+            torus = torus,
+            use_fft = use_fft,
+            use_poly_update = use_poly_update,
+            torch_device = torch_device,
+        )
 
     if animate:
         # Animate automata
@@ -7,7 +7,7 @@ from gol.utils import (
     render_pure_animation,
 )
 from gol.hl.hashlife import (
-    construct, ffwd, successor, join,
+    construct, ffwd, successor_info, join_info,
     expand, advance, centre, inner,
     render_img
 )
@@ -25,8 +25,8 @@ def compute_hl_ffwd(node, giant_leaps, log=True):
         # print node info (k, X x Y, population, ...)
         print('node:', node)
         print('gens:', gens)
-        print('successor:', successor.cache_info())
-        print('join:', join.cache_info())
+        print('successor:', successor_info())
+        print('join:', join_info())
 
     return node, gens
 
@@ -41,8 +41,8 @@ def compute_hl_advance(node, iterations, log=True):
     if log:
         # print node info (k, X x Y, population)
         print('node:', node)
-        print('successor:', successor.cache_info())
-        print('join:', join.cache_info())
+        print('successor:', successor_info())
+        print('join:', join_info())
 
     return node
 